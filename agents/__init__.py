@@ -1,11 +1,23 @@
 """
 Project Commuter - AI Job Application Agents
 Built with Google ADK (Agent Development Kit)
+
+Agents (and their model clients) are constructed on first access, not at import.
 """
 
-from .root.agent import root_agent
-from .ops.agent import ops_agent
-from .scout.agent import scout_agent
-from .vision.agent import vision_agent
+import importlib
+
+_EXPORTS = {
+    "root_agent": ".root.agent",
+    "ops_agent": ".ops.agent",
+    "scout_agent": ".scout.agent",
+    "vision_agent": ".vision.agent",
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = ["root_agent", "ops_agent", "scout_agent", "vision_agent"]
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,124 @@
+"""
+Event Log Plugin
+Runner plugin that feeds tools/event_log.py: runner events, agent transfers,
+model calls (requested vs served model, fallback hops, tokens) and tool calls
+(duration, status, screenshot hash).
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from models.groq_config import fallback_chain
+from tools.browser_tools import get_last_frame_hash
+from tools.event_log import log_event, set_application
+
+
+def _session_id(context: Any) -> str:
+    session = getattr(context, "session", None) or context._invocation_context.session
+    return session.id
+
+
+def _fallback_hops(requested: Optional[str], served: Optional[str]) -> Optional[int]:
+    """Position of the served model in the requested model's fallback chain (litellm drops the provider prefix)."""
+    if not requested or not served:
+        return None
+    for hops, model in enumerate(fallback_chain(requested)):
+        if model == served or model.split("/", 1)[-1] == served:
+            return hops
+    return None
+
+
+class EventLogPlugin(BasePlugin):
+    def __init__(self):
+        super().__init__(name="event_log")
+        # Start time and requested model of in-flight calls
+        self._model_calls: Dict[tuple, tuple] = {}
+        self._tool_calls: Dict[str, float] = {}
+
+    async def on_event_callback(self, *, invocation_context: InvocationContext, event: Event) -> Optional[Event]:
+        session = invocation_context.session.id
+        log_event(session, "event", agent=event.author)
+        if event.actions and event.actions.transfer_to_agent:
+            log_event(session, "transfer", agent=event.author, name=event.actions.transfer_to_agent)
+        return None
+
+    async def before_model_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        self._model_calls[key] = (time.perf_counter(), llm_request.model)
+        return None
+
+    async def after_model_callback(
+        self, *, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        start, requested = self._model_calls.pop(key, (None, None))
+        served = getattr(llm_response, "model_version", None)
+        usage = llm_response.usage_metadata
+        log_event(
+            _session_id(callback_context), "llm",
+            agent=callback_context.agent_name,
+            duration_ms=round((time.perf_counter() - start) * 1000, 1) if start else None,
+            status="error" if llm_response.error_code else "ok",
+            model=requested,
+            served_model=served,
+            fallback_hops=_fallback_hops(requested, served),
+            prompt_tokens=usage.prompt_token_count if usage else None,
+            completion_tokens=usage.candidates_token_count if usage else None,
+        )
+        return None
+
+    async def on_model_error_callback(
+        self, *, callback_context: CallbackContext, llm_request: LlmRequest, error: Exception
+    ) -> Optional[LlmResponse]:
+        start, requested = self._model_calls.pop((callback_context.invocation_id, callback_context.agent_name), (None, None))
+        log_event(
+            _session_id(callback_context), "llm",
+            agent=callback_context.agent_name,
+            duration_ms=round((time.perf_counter() - start) * 1000, 1) if start else None,
+            status="error",
+            model=requested or llm_request.model,
+        )
+        return None
+
+    async def before_tool_callback(
+        self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext
+    ) -> Optional[dict]:
+        self._tool_calls[tool_context.function_call_id] = time.perf_counter()
+        if tool.name == "navigate_to_url":
+            set_application(_session_id(tool_context), tool_args.get("url"))
+        return None
+
+    async def after_tool_callback(
+        self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext, result: dict
+    ) -> Optional[dict]:
+        self._log_tool(tool, tool_context, result.get("status") if isinstance(result, dict) else None,
+                       isinstance(result, dict) and "screenshot_stats" in result)
+        return None
+
+    async def on_tool_error_callback(
+        self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext, error: Exception
+    ) -> Optional[dict]:
+        self._log_tool(tool, tool_context, "error", False)
+        return None
+
+    def _log_tool(self, tool: BaseTool, tool_context: ToolContext, status: Optional[str], captured: bool):
+        start = self._tool_calls.pop(tool_context.function_call_id, None)
+        frame = get_last_frame_hash() if captured else None
+        log_event(
+            _session_id(tool_context), "tool",
+            agent=tool_context.agent_name,
+            name=tool.name,
+            duration_ms=round((time.perf_counter() - start) * 1000, 1) if start else None,
+            status=status,
+            frame_hash=format(frame, "x") if frame is not None else None,
+        )
@@ -3,15 +3,24 @@ Ops Agent - LinkedIn Easy Apply Sniper
 Uses Visual SOM (Set-of-Mark) to click buttons by ID.
 """
 
+import asyncio
+from typing import Any, Dict, Optional, Set
+
 from google.adk.agents import Agent
-from models.groq_config import get_reasoning_model
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+from agents.prompt_budget import PromptBudget
+from models.groq_config import GROQ_MODELS, get_reasoning_model
 from tools.browser_tools import (
     navigate_to_url,
     click_element,
     type_text,
     take_screenshot,
     scroll_page,
+    perform_actions,
 )
+from tools.action_trace import replay_application, finish_application
+from tools.prefetch import PREFETCH_PAGES, next_job_urls, prefetch_urls
 
 OPS_INSTRUCTION = """You are the LinkedIn Easy Apply Sniper.
 
@@ -23,33 +32,95 @@ You do NOT click using X/Y coordinates.
 2. You will see **Green Boxes with Numbers** (e.g., "12", "45") on interactive elements.
 3. To click a button, use `click_element(element_id="12")`.
 4. **NEVER** guess a selector if an ID is visible.
+   IDs are stable: an element keeps its number across screenshots until it leaves the page.
+5. **Long pages & forms**: Instead of calling `scroll_page` repeatedly, call `take_screenshot(full_page=True)` once.
+   It shows the whole page (or the whole Easy Apply form) and IDs below the fold can be clicked directly.
 
 ### The "Easy Apply" Workflow
-1. **Login Check**: If you see a "Sign In" page, STOP. Ask the user to log in manually via the dashboard.
+1. **Login Check**: If `page_state` is LOGIN_DETECTED or INTERVENTION_REQUIRED (or you see a "Sign In" page), STOP. Ask the user to log in or solve the check manually via the dashboard.
 2. **Start**: Navigate to the job URL.
-3. **Identify**: Find the button labeled "Easy Apply" (Look for its Number ID).
-4. **Apply Loop**:
+3. **Replay First**: Call `replay_application()`. If it returns "success", verify the confirmation and skip to step 6.
+   If it returns "diverged" or "no_match", continue manually from the latest screenshot.
+4. **Identify**: Find the button labeled "Easy Apply" (Look for its Number ID).
+5. **Apply Loop**:
    - Click "Easy Apply".
    - If a modal appears, find the "Next" or "Review" button IDs.
    - If input is needed (e.g., Phone), use `type_text(element_id="...", text=...)`.
+   - **Several fields on one step**: fill them in one call with `perform_actions`, e.g.
+     `perform_actions(actions=[{"op": "type", "element_id": "31", "text": "+1 555 0100"}, {"op": "select", "element_id": "33", "text": "Yes"}, {"op": "click", "element_id": "35"}])`.
+     Check `actions` in the result for any item with `ok: false`.
    - **Submit**: Click "Submit application".
+6. **Finish**: Call `finish_application(succeeded=True)` once "Application sent" is confirmed, or `succeeded=False` if you gave up.
+
+Always confirm what you see before clicking: "I see the Easy Apply button at ID 14, clicking now..."
+"""
 
+# Appended after the static instruction on every call (see prompt_budget.py)
+OPS_STATE_TEMPLATE = """
 ### Context
-User Data: {user:full_name}, {user:email}, {user:phone}, {user:skills}
-CV Summary: {user:experience_summary}
+User Data: {full_name}, {email}, {phone}, {skills}
+CV Summary: {experience_summary}
+Queued jobs: {discovered_jobs}
+"""
+
+# Token budget for the templated state section
+OPS_STATE_BUDGET = 750
+
+# Running prefetches, referenced so they are not garbage-collected mid-run
+_prefetch_tasks: Set[asyncio.Task] = set()
+
+
+def _prefetch_done(task: asyncio.Task):
+    _prefetch_tasks.discard(task)
+    if task.cancelled():
+        return
+    error = task.exception() or (task.result() or {}).get("error")
+    if error:
+        print(f"Job prefetch failed: {str(error)}")
+
+
+def prefetch_next_job(
+    tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext, tool_response: dict
+) -> Optional[dict]:
+    """After opening a job, start loading the next queued job(s) in the background."""
+    if tool.name == "navigate_to_url" and PREFETCH_PAGES:
+        upcoming = next_job_urls(tool_context.state.get("discovered_jobs", []), args.get("url", ""))
+        if upcoming:
+            task = asyncio.get_running_loop().create_task(prefetch_urls(upcoming))
+            _prefetch_tasks.add(task)
+            task.add_done_callback(_prefetch_done)
+    return None
 
-Always confirm what you see before clicking: "I see the Easy Apply button at ID 14, clicking now..." """
 
 ops_agent = Agent(
     model=get_reasoning_model(),
     name="ops_agent",
     description="Applies to jobs using Visual SOM (Clicking by ID numbers).",
-    instruction=OPS_INSTRUCTION,
+    instruction=PromptBudget(
+        "ops_agent",
+        OPS_INSTRUCTION,
+        OPS_STATE_TEMPLATE,
+        fields={
+            "full_name": ("user:full_name", 20),
+            "email": ("user:email", 20),
+            "phone": ("user:phone", 12),
+            "skills": ("user:skills", 120),
+            "experience_summary": ("user:experience_summary", 250),
+            # "title (url)" per job: about 30 tokens each, so room for the next few
+            "discovered_jobs": ("discovered_jobs", 250),
+        },
+        budget=OPS_STATE_BUDGET,
+        model=GROQ_MODELS["reasoning"]["primary"],
+    ),
     tools=[
         navigate_to_url,
         click_element,
         type_text,
         take_screenshot,
         scroll_page,
+        perform_actions,
+        replay_application,
+        finish_application,
     ],
+    after_tool_callback=prefetch_next_job,
 )
@@ -0,0 +1,137 @@
+"""
+Prompt Budget
+Instruction provider that keeps the static part of an agent's system prompt byte-identical
+across turns (so provider-side prompt caching can hit) and appends session state after it,
+trimmed per field and overall to a token budget. Token counts are logged per model call.
+"""
+
+from typing import Any, Dict, Tuple
+
+from google.adk.agents.readonly_context import ReadonlyContext
+
+from tools.event_log import log_event
+
+# Rough characters-per-token ratio used when litellm's tokenizer is unavailable
+CHARS_PER_TOKEN = 4
+
+# Smallest cap a field is shrunk to when the whole context is over budget
+MIN_FIELD_TOKENS = 8
+
+_static_tokens: Dict[Tuple[str, str], int] = {}
+_stats: Dict[str, dict] = {}
+_litellm = None
+
+
+def count_tokens(text: str, model: str) -> int:
+    global _litellm
+    try:
+        if _litellm is None:
+            import litellm
+            # Count with litellm's bundled tokenizer: fetching a model's tokenizer from Hugging Face
+            # on first use would block the event loop inside the instruction provider
+            litellm.disable_hf_tokenizer_download = True
+            _litellm = litellm
+        return _litellm.token_counter(model=model, text=text)
+    except Exception:
+        return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _render_item(item: Any) -> str:
+    if not isinstance(item, dict):
+        return str(item)
+    title, url = item.get("title", ""), item.get("url", "")
+    # The URL is what an agent navigates to, so it is never dropped for the title
+    return f"{title} ({url})" if title and url else title or url
+
+
+def _render_value(value: Any) -> list:
+    """State value as a list of display items (a plain string is a single item)."""
+    if isinstance(value, (list, tuple)):
+        return [_render_item(item) for item in value]
+    return [str(value)]
+
+
+def fit_value(value: Any, max_tokens: int, model: str) -> Tuple[str, bool]:
+    """Render a state value within `max_tokens`. Returns (text, truncated)."""
+    items = _render_value(value)
+    text = ", ".join(items)
+    if count_tokens(text, model) <= max_tokens:
+        return text, False
+
+    if len(items) > 1:
+        # Lists keep whole leading items plus a count of the rest; each item is counted once
+        # and the prefix kept as a running total
+        kept, used = [], count_tokens(f" (+{len(items)} more)", model)
+        separator = count_tokens(", ", model)
+        for item in items:
+            cost = count_tokens(item, model) + (separator if kept else 0)
+            if used + cost > max_tokens:
+                break
+            kept.append(item)
+            used += cost
+        return ", ".join(kept) + f" (+{len(items) - len(kept)} more)", True
+
+    # Long text is cut at a word boundary
+    chars = len(text) * max_tokens // max(1, count_tokens(text, model))
+    return text[:chars].rsplit(" ", 1)[0] + " …", True
+
+
+class PromptBudget:
+    """
+    ADK instruction provider: `static` verbatim, then `template` filled from session state.
+
+    fields maps each template placeholder to (state key, max tokens); `budget` caps the
+    whole state section, shrinking the largest fields first when it is exceeded.
+    """
+
+    def __init__(self, agent_name: str, static: str, template: str, fields: Dict[str, Tuple[str, int]],
+                 budget: int, model: str):
+        self.agent_name = agent_name
+        self.static = static
+        self.template = template
+        self.fields = fields
+        self.budget = budget
+        self.model = model
+
+    def __call__(self, context: ReadonlyContext) -> str:
+        caps = {name: cap for name, (_key, cap) in self.fields.items()}
+        while True:
+            values, truncated = {}, []
+            for name, (key, _cap) in self.fields.items():
+                values[name], cut = fit_value(context.state.get(key, ""), caps[name], self.model)
+                if cut:
+                    truncated.append(name)
+            dynamic = self.template.format(**values)
+            dynamic_tokens = count_tokens(dynamic, self.model)
+
+            shrinkable = [name for name in caps if caps[name] > MIN_FIELD_TOKENS]
+            if dynamic_tokens <= self.budget or not shrinkable:
+                break
+            largest = max(shrinkable, key=lambda name: count_tokens(values[name], self.model))
+            caps[largest] = max(MIN_FIELD_TOKENS, caps[largest] // 2)
+
+        static_key = (self.model, self.static)
+        if static_key not in _static_tokens:
+            _static_tokens[static_key] = count_tokens(self.static, self.model)
+        static_tokens = _static_tokens[static_key]
+
+        _stats[self.agent_name] = {
+            "static_tokens": static_tokens,
+            "dynamic_tokens": dynamic_tokens,
+            "budget": self.budget,
+            "truncated": truncated,
+        }
+        session = getattr(context, "session", None) or context._invocation_context.session
+        log_event(
+            session.id, "prompt",
+            agent=self.agent_name,
+            status="truncated" if truncated else "ok",
+            name=",".join(truncated) or None,
+            prompt_tokens=static_tokens + dynamic_tokens,
+        )
+        return self.static + dynamic
+
+
+def get_prompt_stats() -> Dict[str, dict]:
+    """Instruction token counts of each agent's last model call."""
+    return dict(_stats)
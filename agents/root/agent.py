@@ -4,7 +4,8 @@ Strictly coordinates the CV-based LinkedIn application process.
 """
 
 from google.adk.agents import Agent
-from models.groq_config import get_fast_model
+from agents.prompt_budget import PromptBudget
+from models.groq_config import GROQ_MODELS, get_fast_model
 from agents.vision.agent import vision_agent
 from agents.scout.agent import scout_agent
 from agents.ops.agent import ops_agent
@@ -14,14 +15,9 @@ ROOT_INSTRUCTION = """You are the Project Commuter Orchestrator, specifically co
 ## Your Goal
 To apply for "Easy Apply" jobs on LinkedIn using the user's uploaded CV context.
 
-## Your State
-You have access to the user's session state:
-- Name: {user:full_name}
-- CV Summary: {user:experience_summary}
-
 ## Critical Rules
 1. **CV Check**: 
-   - Check `{user:full_name}`. 
+   - Check the Name under "Your State" below. 
    - If it is "Candidate", ask the user to upload a CV.
    - If it is a real name (e.g., "Onyeka Nwokike"), assume the CV is valid and proceed.
 2. **LinkedIn Only**: You strictly enforce the LinkedIn scope.
@@ -30,13 +26,25 @@ You have access to the user's session state:
 ## Delegation Strategy
 - **Searching**: Delegate to **Scout Agent**.
 - **Applying**: Delegate to **Ops Agent**.
-- **Visuals**: Delegate to **Vision Agent** to check for login screens.
+- **Visuals**: Every browser tool result carries a `page_state` (LOGIN_DETECTED, INTERVENTION_REQUIRED, EASY_APPLY_MODAL, SUCCESS or UNKNOWN).
+  Trust it when it is not UNKNOWN. Only delegate to **Vision Agent** when `page_state` is UNKNOWN.
 
 ## Interaction Style
 - Be concise.
 - If the user says "Open linkedin", delegate to the Ops Agent to navigate there.
 """
 
+# Appended after the static instruction on every call (see prompt_budget.py)
+ROOT_STATE_TEMPLATE = """
+## Your State
+You have access to the user's session state:
+- Name: {full_name}
+- CV Summary: {experience_summary}
+"""
+
+# Token budget for the templated state section
+ROOT_STATE_BUDGET = 300
+
 def initialize_session_state(callback_context):
     state = callback_context.state
     state.setdefault("user:full_name", "Candidate")
@@ -53,7 +61,17 @@ root_agent = Agent(
     model=get_fast_model(),
     name="root_agent",
     description="Main orchestrator for the LinkedIn Sniper workflow.",
-    instruction=ROOT_INSTRUCTION,
+    instruction=PromptBudget(
+        "root_agent",
+        ROOT_INSTRUCTION,
+        ROOT_STATE_TEMPLATE,
+        fields={
+            "full_name": ("user:full_name", 20),
+            "experience_summary": ("user:experience_summary", 250),
+        },
+        budget=ROOT_STATE_BUDGET,
+        model=GROQ_MODELS["orchestrator"]["primary"],
+    ),
     sub_agents=[vision_agent, scout_agent, ops_agent],
     before_agent_callback=initialize_session_state,
 )
@@ -4,18 +4,29 @@ STRICTLY confined to searching LinkedIn for jobs.
 """
 
 from google.adk.agents import Agent
+from google.adk.tools.tool_context import ToolContext
 from models.groq_config import get_research_model
 from tools.search_tools import search_jobs
 
 # Custom wrapper to FORCE LinkedIn searches
-def search_linkedin_jobs(query: str, location: str = "") -> dict:
+def search_linkedin_jobs(query: str, tool_context: ToolContext, location: str = "") -> dict:
     """
     Search strictly for LinkedIn job postings.
     The agent cannot override the site filter.
     """
     # Force the query to look only at LinkedIn
     refined_query = f"site:linkedin.com/jobs {query} {location}"
-    return search_jobs(query=refined_query, max_results=8)
+    result = search_jobs(query=refined_query, max_results=8)
+
+    # Queue the job pages so the Ops Agent can prefetch the next one while applying
+    jobs = list(tool_context.state.get("discovered_jobs", []))
+    known = {job["url"] for job in jobs}
+    for job in result.get("results", []):
+        if "linkedin.com/jobs" in job["url"] and job["url"] not in known:
+            jobs.append({"title": job["title"], "url": job["url"]})
+            known.add(job["url"])
+    tool_context.state["discovered_jobs"] = jobs
+    return result
 
 
 SCOUT_INSTRUCTION = """You are a LinkedIn Search Specialist.
@@ -3,9 +3,17 @@ Vision Agent - Screen Analyst
 Analyzes screenshots for state detection (Login, CAPTCHA, Success).
 """
 
+import re
+from typing import Dict, Optional, Tuple
+
 from google.adk.agents import Agent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
 from models.groq_config import get_vision_model
-from tools.browser_tools import take_screenshot
+from tools.browser_tools import take_screenshot, get_last_frame_hash
+from tools.frame_cache import vision_cache
+from . import speculative
 
 VISION_INSTRUCTION = """You are the Vision Agent. Your job is to analyze the browser state.
 
@@ -14,6 +22,10 @@ The screenshots you receive will have **Green Bounding Boxes with Numbers** over
 - **IGNORE** these green boxes when describing the page aesthetics.
 - **USE** these numbers if asked to identify specific buttons (e.g., "The Login button is #12").
 
+## Heuristic Pre-Check
+`take_screenshot` returns a `page_state` from a fast DOM classifier. If it is not UNKNOWN, report it directly.
+Only analyze the image yourself when `page_state` is UNKNOWN.
+
 ## Detection Priorities
 1. **Login Screens**: Look for "Sign In", "Join Now", or "Email" fields. If found, report: "LOGIN_DETECTED".
 2. **CAPTCHAs**: Look for puzzles or "I am not a robot". If found, report: "INTERVENTION_REQUIRED".
@@ -23,10 +35,93 @@ The screenshots you receive will have **Green Bounding Boxes with Numbers** over
 Output your analysis clearly: "Page is a LinkedIn Job Listing. Login required." or "Page is the Easy Apply modal."
 """
 
+# Cache key of the in-flight model call, per invocation: (frame hash, question)
+_pending_keys: Dict[str, Tuple[int, str]] = {}
+
+# The speculative verdict only covers page state; anything else (specific elements,
+# free-form questions) needs the model
+_PAGE_STATE_QUESTION = re.compile(
+    r"\b(log ?in|sign(ed)? ?in|captcha|robot|security check|verif\w*|modal|easy apply|submitted"
+    r"|application sent|success\w*|state|status)\b|what(?:'s| is) on the (?:page|screen)",
+    re.IGNORECASE,
+)
+_ELEMENT_QUESTION = re.compile(r"#\d|\bwhich\b|\bwhere\b|\bnumber\b|\bid\b", re.IGNORECASE)
+
+# ADK relays other agents' turns (e.g. the orchestrator's transfer) as user content with this prefix
+_RELAYED_PREFIX = "For context:"
+
+
+def _latest_question(llm_request: LlmRequest) -> str:
+    """
+    The question this vision call answers. After a hand-over that is what the orchestrator said
+    (empty for a bare transfer, where the agent's own instruction is the task); otherwise the
+    user's latest message to this agent.
+    """
+    for content in reversed(llm_request.contents or []):
+        if content.role != "user" or not content.parts:
+            continue
+        texts = [part.text for part in content.parts if getattr(part, "text", None)]
+        if not texts:
+            continue
+        if texts[0] == _RELAYED_PREFIX:
+            return " ".join(text.split(" said: ", 1)[1] for text in texts[1:] if " said: " in text).strip()
+        return " ".join(texts).strip()
+    return ""
+
+
+def _asks_page_state(question: str) -> bool:
+    if not question:
+        return True
+    return bool(_PAGE_STATE_QUESTION.search(question)) and not _ELEMENT_QUESTION.search(question)
+
+
+async def answer_from_cache(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """
+    Skip the multimodal round trip when this frame/question pair was already answered,
+    or when a page-state check was already run speculatively on this frame.
+    """
+    _pending_keys.pop(callback_context.invocation_id, None)
+    frame = get_last_frame_hash()
+    question = _latest_question(llm_request)
+    cached = vision_cache.get(frame, question)
+    if cached is None and _asks_page_state(question):
+        cached = await speculative.lookup(frame)
+    if cached is not None:
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=cached)]))
+
+    if frame is not None:
+        _pending_keys[callback_context.invocation_id] = (frame, question)
+    return None
+
+
+def store_in_cache(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """Remember final text answers (not tool calls) against the frame they describe."""
+    key = _pending_keys.pop(callback_context.invocation_id, None)
+    if key is None or llm_response.partial or not llm_response.content or not llm_response.content.parts:
+        return None
+
+    parts = llm_response.content.parts
+    if any(getattr(part, "function_call", None) for part in parts):
+        return None
+
+    answer = "".join(part.text for part in parts if getattr(part, "text", None))
+    vision_cache.put(key[0], key[1], answer)
+    return None
+
+
+def drop_pending_key(callback_context: CallbackContext, llm_request: LlmRequest, error: Exception) -> Optional[LlmResponse]:
+    """A failed model call has nothing to cache; forget its key and let the error propagate."""
+    _pending_keys.pop(callback_context.invocation_id, None)
+    return None
+
+
 vision_agent = Agent(
     model=get_vision_model(),
     name="vision_agent",
     description="Analyzes screenshots to detect Login pages, CAPTCHAs, or Application status.",
     instruction=VISION_INSTRUCTION,
     tools=[take_screenshot],
+    before_model_callback=answer_from_cache,
+    after_model_callback=store_in_cache,
+    on_model_error_callback=drop_pending_key,
 )
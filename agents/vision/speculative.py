@@ -0,0 +1,131 @@
+"""
+Speculative Vision
+Optionally starts the page-state check as soon as a browser tool captures a frame, instead
+of waiting for the orchestrator to delegate to the Vision Agent. The answer is cached against
+the frame hash, so a later delegation for the same frame returns without a new round trip.
+
+COMMUTER_SPECULATIVE_VISION:
+    off        no speculation (default)
+    heuristic  cache the DOM classifier's verdict (free)
+    vision     also run a cheap vision call in the background when the heuristic says UNKNOWN
+"""
+
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+from models.groq_config import GROQ_MODELS
+from tools.browser_tools import get_last_frame_hash
+from tools.frame_cache import is_same_frame, vision_cache
+from tools.page_state import UNKNOWN
+
+SPECULATIVE_VISION = os.getenv("COMMUTER_SPECULATIVE_VISION", "off").lower()
+
+# Cache "question" under which per-frame speculative verdicts are stored
+SPECULATIVE_QUESTION = "__page_state__"
+
+# Background vision calls kept in flight at once; older frames are superseded by newer ones
+MAX_PENDING = 2
+
+# How long a delegation waits for an in-flight speculative call before asking the model itself
+WAIT_FOR_PENDING = 15.0
+
+SPECULATIVE_PROMPT = """Classify this LinkedIn browser screenshot (green numbered boxes are overlay markers, ignore them).
+Answer with exactly one of LOGIN_DETECTED, INTERVENTION_REQUIRED (CAPTCHA / security check), EASY_APPLY_MODAL,
+SUCCESS (application sent) or OTHER, followed by one sentence describing the page."""
+
+_pending: Dict[int, asyncio.Task] = {}
+_stats = {"heuristic": 0, "vision_started": 0, "vision_failed": 0, "served": 0, "superseded": 0}
+
+
+def _describe(page_state: dict) -> str:
+    return f"{page_state['state']}: {page_state.get('reason', '')} (DOM heuristic, confidence {page_state.get('confidence', 0):.2f})"
+
+
+async def _analyze(frame: int, image_base64: str, image_format: str):
+    from models import llm_client
+
+    try:
+        response = await llm_client.acompletion(
+            role="vision",
+            model=GROQ_MODELS["vision"]["primary"],
+            messages=[{
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": SPECULATIVE_PROMPT},
+                    {"type": "image_url", "image_url": {"url": f"data:image/{image_format.lower()};base64,{image_base64}"}},
+                ],
+            }],
+            max_tokens=80,
+        )
+        vision_cache.put(frame, SPECULATIVE_QUESTION, response.choices[0].message.content.strip())
+    except Exception as e:
+        _stats["vision_failed"] += 1
+        print(f"Speculative vision failed: {str(e)}")
+    finally:
+        _pending.pop(frame, None)
+
+
+def speculate(frame: Optional[int], result: dict):
+    """Start (or skip) the page-state check for a freshly captured frame."""
+    if SPECULATIVE_VISION == "off" or frame is None or not isinstance(result, dict):
+        return
+    if vision_cache.peek(frame, SPECULATIVE_QUESTION) is not None or frame in _pending:
+        return
+
+    page_state = result.get("page_state") or {}
+    if page_state.get("state", UNKNOWN) != UNKNOWN:
+        vision_cache.put(frame, SPECULATIVE_QUESTION, _describe(page_state))
+        _stats["heuristic"] += 1
+        return
+
+    if SPECULATIVE_VISION == "vision" and result.get("screenshot_base64"):
+        # Only the newest frames matter; drop the oldest speculation when too many are queued
+        while len(_pending) >= MAX_PENDING:
+            _pending.pop(next(iter(_pending))).cancel()
+            _stats["superseded"] += 1
+        image_format = (result.get("screenshot_stats") or {}).get("format", "jpeg")
+        _pending[frame] = asyncio.create_task(_analyze(frame, result["screenshot_base64"], image_format))
+        _stats["vision_started"] += 1
+
+
+async def lookup(frame: Optional[int]) -> Optional[str]:
+    """Speculative verdict for `frame`, waiting briefly for one that is still being computed."""
+    if SPECULATIVE_VISION == "off" or frame is None:
+        return None
+
+    answer = vision_cache.get(frame, SPECULATIVE_QUESTION)
+    if answer is None:
+        task = next((task for pending, task in _pending.items() if is_same_frame(pending, frame)), None)
+        if task is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(task), WAIT_FOR_PENDING)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                return None
+            answer = vision_cache.get(frame, SPECULATIVE_QUESTION)
+
+    if answer is not None:
+        _stats["served"] += 1
+    return answer
+
+
+def get_speculation_stats() -> dict:
+    return {**_stats, "mode": SPECULATIVE_VISION, "pending": len(_pending)}
+
+
+class SpeculativeVisionPlugin(BasePlugin):
+    """Kicks off speculation after every browser tool call that returned a screenshot, for all agents."""
+
+    def __init__(self):
+        super().__init__(name="speculative_vision")
+
+    async def after_tool_callback(
+        self, *, tool: BaseTool, tool_args: Dict[str, Any], tool_context: ToolContext, result: dict
+    ) -> Optional[dict]:
+        if isinstance(result, dict) and "screenshot_base64" in result:
+            speculate(get_last_frame_hash(), result)
+        return None
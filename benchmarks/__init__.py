@@ -0,0 +1,4 @@
+"""
+Project Commuter - Benchmarks
+Standalone performance scripts, run with `python -m benchmarks.<name>`
+"""
@@ -0,0 +1,103 @@
+"""
+Browser Worker Broker Load Benchmark
+Drives many concurrent sessions through the broker with a stand-in for a screenshot tool
+(an I/O wait for the page load, then SOM overlay render + PNG encode) and reports throughput
+per worker count. No Chrome is launched; the point is how routing and process fan-out scale,
+and that sessions sharing a worker overlap their waits without seeing each other's tab state.
+
+Usage:
+    python -m benchmarks.broker_load_bench [--sessions 8] [--calls 10] [--workers 0 1 2 4] [--io-ms 0 200]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# Workers must not pre-launch Chrome for this benchmark (spawned children inherit the env)
+os.environ.setdefault("COMMUTER_PRELAUNCH_BROWSER", "0")
+
+from tools import browser_broker
+from tools.browser_broker import routed
+
+
+@routed
+async def synthetic_capture(seed: int, elements: int = 150, io_ms: float = 0, marker: str = "") -> dict:
+    """Stand-in for take_screenshot: wait for a "page load", then tag a synthetic frame and encode it."""
+    from benchmarks.som_render_bench import make_frame
+    from tools import browser_tools
+    from tools.som_render import encode_overlay, render_overlay
+
+    # Per-session tab state must survive other sessions running during the wait
+    som_map = browser_tools.get_som_map()
+    isolated = som_map.get("marker", marker) == marker
+    som_map["marker"] = marker
+    await asyncio.sleep(io_ms / 1000)
+    isolated = isolated and browser_tools.get_som_map().get("marker") == marker
+
+    frame, boxes = make_frame(1280, 800, elements + seed % 7)
+    data, _mime = encode_overlay(render_overlay(frame, boxes))
+    return {"status": "success", "bytes": len(data), "pid": os.getpid(), "isolated": isolated}
+
+
+async def run_session(session: str, calls: int, io_ms: float, latencies: list, pids: set, leaks: list):
+    for i in range(calls):
+        browser_broker.set_current_session(session)
+        start = time.perf_counter()
+        result = await synthetic_capture(seed=i, io_ms=io_ms, marker=session)
+        latencies.append((time.perf_counter() - start) * 1000)
+        pids.add(result["pid"])
+        if not result["isolated"]:
+            leaks.append(session)
+
+
+async def measure(workers: int, sessions: int, calls: int, io_ms: float) -> dict:
+    await browser_broker.start_broker(workers)
+    try:
+        latencies, pids, leaks = [], set(), []
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            run_session(f"session-{n}", calls, io_ms, latencies, pids, leaks) for n in range(sessions)
+        ))
+        elapsed = time.perf_counter() - start
+    finally:
+        await browser_broker.stop_broker()
+
+    latencies.sort()
+    return {
+        "calls_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        "processes": len(pids),
+        "leaks": len(leaks),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=10, help="Calls per session")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4], help="0 = in-process")
+    parser.add_argument("--io-ms", type=float, nargs="+", default=[0, 200],
+                        help="Simulated page-load wait per call (0 = CPU only)")
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions x {args.calls} calls (CPU cores: {os.cpu_count()})")
+    for io_ms in args.io_ms:
+        print(f"\nI/O wait {io_ms:g} ms per call")
+        print(f"{'workers':>7} {'calls/s':>9} {'p50':>9} {'p99':>9} {'procs':>6} {'leaks':>6} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            stats = asyncio.run(measure(workers, args.sessions, args.calls, io_ms))
+            baseline = baseline or stats["calls_per_s"]
+            # In-process, all sessions share one tab by design, so only workers can leak state
+            leaks = stats["leaks"] if workers else "-"
+            print(
+                f"{workers:>7} {stats['calls_per_s']:>9.1f} {stats['p50_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms "
+                f"{stats['processes']:>6} {leaks:>6} {stats['calls_per_s'] / baseline:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
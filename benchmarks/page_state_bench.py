@@ -0,0 +1,56 @@
+"""
+Page-State Classifier Benchmark
+Measures accuracy and latency of the heuristic classifier against DOM fixtures.
+
+Usage:
+    python -m benchmarks.page_state_bench [--iterations 1000]
+"""
+
+import argparse
+import json
+import os
+import time
+
+from tools.page_state import classify_page_state
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "page_states.json")
+
+
+def run(iterations: int) -> dict:
+    with open(FIXTURES) as f:
+        fixtures = json.load(f)
+
+    correct = 0
+    misses = []
+    for fixture in fixtures:
+        result = classify_page_state(fixture["signals"], fixture["elements"])
+        if result["state"] == fixture["expected"]:
+            correct += 1
+        else:
+            misses.append(f"{fixture['name']}: expected {fixture['expected']}, got {result['state']}")
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for fixture in fixtures:
+            classify_page_state(fixture["signals"], fixture["elements"])
+    elapsed = time.perf_counter() - start
+
+    return {
+        "fixtures": len(fixtures),
+        "accuracy": correct / len(fixtures),
+        "misses": misses,
+        "mean_latency_us": elapsed / (iterations * len(fixtures)) * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args()
+
+    report = run(args.iterations)
+    print(f"Fixtures: {report['fixtures']}")
+    print(f"Accuracy: {report['accuracy']:.0%}")
+    print(f"Mean latency: {report['mean_latency_us']:.1f} us/page")
+    for miss in report["misses"]:
+        print(f"  MISS {miss}")
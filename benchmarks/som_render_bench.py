@@ -0,0 +1,97 @@
+"""
+SOM Overlay Renderer Benchmark
+Times the legacy per-element PIL drawing against the sprite-cached renderer
+and the dashboard encoders, for 10-1000 elements.
+
+Usage:
+    python -m benchmarks.som_render_bench [--repeat 5] [--width 1280 --height 800]
+"""
+
+import argparse
+import io
+import random
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+from tools import som_render
+
+COUNTS = (10, 50, 100, 300, 600, 1000)
+
+
+def legacy_render(image: Image.Image, boxes) -> Image.Image:
+    """The original _tag_screenshot drawing loop."""
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+    for x, y, w, h, label in boxes:
+        draw.rectangle([x, y, x + w, y + h], outline="#00ff00", width=2)
+        draw.rectangle([x, y, x + 20, y + 15], fill="#00ff00")
+        draw.text((x + 2, y + 1), label, fill="black", font=font)
+    return image
+
+
+def make_frame(width: int, height: int, count: int) -> tuple:
+    rng = random.Random(count)
+    image = Image.new("RGB", (width, height), "#f3f2ef")
+    draw = ImageDraw.Draw(image)
+    for _ in range(200):
+        x, y = rng.randint(0, width), rng.randint(0, height)
+        draw.rectangle([x, y, x + rng.randint(20, 300), y + rng.randint(10, 60)], fill=(rng.randint(0, 255),) * 3)
+    boxes = [
+        (rng.uniform(0, width - 40), rng.uniform(0, height - 20), rng.uniform(20, 200), rng.uniform(14, 48), str(i + 1))
+        for i in range(count)
+    ]
+    return image, boxes
+
+
+def best_ms(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def encode_ms(image: Image.Image, repeat: int, **save_args) -> tuple:
+    size = 0
+
+    def encode():
+        nonlocal size
+        buffered = io.BytesIO()
+        image.save(buffered, **save_args)
+        size = len(buffered.getvalue())
+
+    return best_ms(encode, repeat), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=800)
+    args = parser.parse_args()
+
+    print(f"Frame {args.width}x{args.height}, best of {args.repeat}")
+    print(f"{'elements':>8} {'legacy':>9} {'sprites':>10}")
+
+    for count in COUNTS:
+        frame, boxes = make_frame(args.width, args.height, count)
+        som_render.label_sprite("1")  # font load is a one-off cost, like in the server
+        legacy = best_ms(lambda: legacy_render(frame.copy(), boxes), args.repeat)
+        sprites = best_ms(lambda: som_render.render_overlay(frame.copy(), boxes), args.repeat)
+        print(f"{count:>8} {legacy:>7.1f}ms {sprites:>8.1f}ms")
+
+    tagged = som_render.render_overlay(*make_frame(args.width, args.height, 300))
+    print("\nDashboard encoding (300 elements):")
+    for name, save_args in (
+        ("PNG level 6 (old default)", {"format": "PNG"}),
+        ("PNG level 1", {"format": "PNG", "compress_level": 1}),
+        ("JPEG q80", {"format": "JPEG", "quality": 80}),
+    ):
+        ms, size = encode_ms(tagged, args.repeat, **save_args)
+        print(f"  {name:<26} {ms:>7.1f} ms {size:>10,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Server Startup Benchmark
+Breaks down the import cost of server.py per top-level module (python -X importtime),
+then times the deferred agent-tree build that now happens after startup.
+
+Usage:
+    python -m benchmarks.startup_bench [--top 15] [--skip-agents]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile(statement: str) -> tuple:
+    """Run `statement` in a fresh interpreter; return (total_ms, {top-level module: cumulative ms})."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    per_module = defaultdict(float)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Only outermost imports (no extra indentation) contribute their cumulative time
+        if not name[1:].startswith(" ") and cumulative_us.strip().isdigit():
+            per_module[name.strip().split(".")[0]] += int(cumulative_us) / 1000
+
+    return sum(per_module.values()), dict(per_module)
+
+
+def report(title: str, statement: str, top: int):
+    total, per_module = import_profile(statement)
+    print(f"{title}: {total:.0f} ms")
+    for name, ms in sorted(per_module.items(), key=lambda item: -item[1])[:top]:
+        print(f"  {ms:>8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--skip-agents", action="store_true", help="Only measure server import")
+    args = parser.parse_args()
+
+    report("import server (ready to serve)", "import server", args.top)
+    if not args.skip_agents:
+        print()
+        report("import server + agent tree build (now deferred past startup)", "import server; server._build_runner()", args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Vision Input Benchmark
+Compares bytes and latency of full tagged PNGs against preprocessed model images.
+
+Usage:
+    python -m benchmarks.vision_input_bench [screenshot.png ...] [--live]
+
+Without image arguments a synthetic 1920x1080 SOM frame with an open dialog is used.
+--live also times a real vision call per variant (needs GROQ_API_KEY).
+"""
+
+import argparse
+import base64
+import io
+import random
+import time
+
+from PIL import Image, ImageDraw
+
+from tools.image_prep import prepare_for_model, region_of_interest
+
+QUESTION = "Is this the Easy Apply modal? Answer with one word."
+
+
+def synthetic_frame() -> tuple:
+    """A busy feed page with an Easy Apply dialog and SOM boxes drawn on top."""
+    rng = random.Random(7)
+    image = Image.new("RGB", (1920, 1080), "#f3f2ef")
+    draw = ImageDraw.Draw(image)
+    som_map = {}
+    for idx in range(300):
+        x, y = rng.randint(0, 1850), rng.randint(0, 1050)
+        w, h = rng.randint(30, 160), rng.randint(16, 40)
+        draw.rectangle([x, y, x + w, y + h], fill=(rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+        draw.rectangle([x, y, x + w, y + h], outline="#00ff00", width=2)
+        draw.rectangle([x, y, x + 20, y + 15], fill="#00ff00")
+        draw.text((x + 2, y + 1), str(idx + 1), fill="black")
+        som_map[str(idx + 1)] = {"x": x + w / 2, "y": y + h / 2, "w": w, "h": h}
+
+    dialog_rect = {"x": 560, "y": 140, "w": 800, "h": 760}
+    draw.rectangle([560, 140, 1360, 900], fill="white", outline="#888888")
+    draw.text((600, 180), "Apply to Acme\nContact info", fill="black")
+    return image, som_map, dialog_rect
+
+
+def encode_png(image: Image.Image) -> tuple:
+    start = time.perf_counter()
+    buffered = io.BytesIO()
+    image.save(buffered, format="PNG")
+    data = base64.b64encode(buffered.getvalue()).decode("utf-8")
+    return data, {"bytes": len(buffered.getvalue()), "prep_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+def time_vision_call(image_base64: str, mime: str) -> float:
+    import litellm
+    from models.groq_config import GROQ_MODELS
+
+    start = time.perf_counter()
+    litellm.completion(
+        model=GROQ_MODELS["vision"]["primary"],
+        messages=[{
+            "role": "user",
+            "content": [
+                {"type": "text", "text": QUESTION},
+                {"type": "image_url", "image_url": {"url": f"data:{mime};base64,{image_base64}"}},
+            ],
+        }],
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("images", nargs="*")
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+
+    frames = [(path, Image.open(path), {}, None) for path in args.images]
+    if not frames:
+        image, som_map, dialog_rect = synthetic_frame()
+        frames = [("synthetic", image, som_map, dialog_rect)]
+
+    for name, image, som_map, dialog_rect in frames:
+        full_base64, full_stats = encode_png(image)
+        roi = region_of_interest(image.size, som_map, dialog_rect)
+        model_base64, model_stats = prepare_for_model(image, roi)
+
+        print(f"{name} {image.size[0]}x{image.size[1]}")
+        print(f"  before: {full_stats['bytes']:>9,} bytes  encode {full_stats['prep_ms']:>7.1f} ms  (PNG, full frame)")
+        print(
+            f"  after:  {model_stats['bytes']:>9,} bytes  encode {model_stats['prep_ms']:>7.1f} ms  "
+            f"({model_stats['format']}, {model_stats['size'][0]}x{model_stats['size'][1]}, cropped={model_stats['cropped']})"
+        )
+        print(f"  size reduction: {1 - model_stats['bytes'] / full_stats['bytes']:.0%}")
+
+        if args.live:
+            mime = f"image/{model_stats['format'].lower()}"
+            print(f"  vision call before: {time_vision_call(full_base64, 'image/png'):.0f} ms")
+            print(f"  vision call after:  {time_vision_call(model_base64, mime):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
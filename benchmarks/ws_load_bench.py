@@ -0,0 +1,303 @@
+"""
+WebSocket Load Benchmark
+Runs the real FastAPI app in a subprocess with the browser tools and the agent runner
+replaced by local stand-ins, opens many /ws dashboard connections that send chat and
+intervention messages, and reports reply throughput, screenshot delivery latency,
+dropped frames and server memory growth per client count.
+
+Stand-in frames are real SOM-tagged PNGs with a timestamp appended after the image data
+(decoders ignore trailing bytes), so clients can measure delivery latency exactly.
+
+Usage:
+    python -m benchmarks.ws_load_bench [--clients 10 50 100] [--duration 20]
+    python -m benchmarks.ws_load_bench --clients 50 --max-p99-ms 500 --max-drop-rate 0.01   # regression gate
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import socket
+import struct
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Trailer appended to every stand-in frame: magic + send time + sequence number + padding (24 bytes = 32 base64 chars)
+STAMP_MAGIC = b"CMTR"
+STAMP_FORMAT = "!4sdQ4x"
+STAMP_B64_LEN = 32
+
+
+# ---------------------------------------------------------------------------
+# Server side (runs in the subprocess)
+# ---------------------------------------------------------------------------
+
+def _rss_kb() -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def serve(port: int, llm_ms: float, elements: int):
+    # No Chrome, no agent tree: everything the dashboard sees comes from the stand-ins below
+    os.environ["COMMUTER_PRELOAD_AGENTS"] = "0"
+    os.environ["COMMUTER_PRELAUNCH_BROWSER"] = "0"
+    os.environ["COMMUTER_BROWSER_WORKERS"] = "0"
+
+    from types import SimpleNamespace
+
+    import uvicorn
+
+    import server
+    from benchmarks.som_render_bench import make_frame
+    from tools import browser_tools
+    from tools.som_render import encode_overlay, render_overlay
+
+    frames = []
+    for n in range(8):
+        image, boxes = make_frame(1280, 800, elements + n)
+        png = base64.b64decode(encode_overlay(render_overlay(image, boxes))[0])
+        # Pad to a multiple of 3 so the stamp encodes to its own base64 suffix
+        frames.append(png + b"\0" * (-len(png) % 3))
+
+    counters = {"frames": 0, "chats": 0, "actions": 0}
+
+    async def stand_in_screenshot(*args, **kwargs) -> dict:
+        counters["frames"] += 1
+        stamp = struct.pack(STAMP_FORMAT, STAMP_MAGIC, time.time(), counters["frames"])
+        frame = frames[counters["frames"] % len(frames)] + stamp
+        await browser_tools.emit_screenshot(base64.b64encode(frame).decode("ascii"), "image/png")
+        return {"status": "success", "interactive_elements_count": elements}
+
+    async def stand_in_action(*args, **kwargs) -> dict:
+        counters["actions"] += 1
+        await asyncio.sleep(0.05)
+        return await stand_in_screenshot()
+
+    class StandInRunner:
+        """Mimics one agent turn: model latency, a screenshot tool call, then a text reply."""
+
+        async def run_async(self, user_id, session_id, new_message):
+            counters["chats"] += 1
+            await asyncio.sleep(random.uniform(0.5, 1.5) * llm_ms / 1000)
+            await stand_in_screenshot()
+            yield SimpleNamespace(
+                content=SimpleNamespace(parts=[SimpleNamespace(text=f"ack {new_message.parts[0].text}")]),
+                actions=None,
+                transfer_to_agent=None,
+            )
+
+    runner = StandInRunner()
+
+    async def get_runner():
+        return runner
+
+    server.get_runner = get_runner
+    server.take_screenshot = stand_in_screenshot
+    server.click_element = stand_in_action
+    server.type_text = stand_in_action
+
+    @server.app.get("/_load/stats")
+    async def load_stats():
+        return {**counters, "rss_kb": _rss_kb(), "websockets": len(server.active_websockets)}
+
+    uvicorn.run(server.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+# ---------------------------------------------------------------------------
+# Load generator
+# ---------------------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get_json(url: str) -> dict:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read())
+
+
+def start_server(args) -> tuple:
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.ws_load_bench", "--serve", "--port", str(port),
+         "--llm-ms", str(args.llm_ms), "--elements", str(args.elements)],
+        cwd=ROOT,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            _get_json(base + "/healthz")
+            return proc, port
+        except OSError:
+            if proc.poll() is not None or time.monotonic() > deadline:
+                proc.kill()
+                raise RuntimeError("Load-test server failed to start")
+            time.sleep(0.2)
+
+
+def _frame_stamp(data: str) -> tuple:
+    magic, sent, seq = struct.unpack(STAMP_FORMAT, base64.b64decode(data[-STAMP_B64_LEN:]))
+    return (sent, seq) if magic == STAMP_MAGIC else (None, None)
+
+
+async def run_client(url: str, deadline: float, args, results: dict):
+    import websockets
+
+    rng = random.Random()
+    pending = None
+
+    async with websockets.connect(url, max_size=None) as ws:
+        json.loads(await ws.recv())  # "connected"
+
+        async def receive():
+            async for raw in ws:
+                message = json.loads(raw)
+                kind = message.get("type")
+                if kind == "screenshot":
+                    sent, _seq = _frame_stamp(message["data"])
+                    results["frames"] += 1
+                    if sent is not None:
+                        results["frame_ms"].append((time.time() - sent) * 1000)
+                elif kind in ("agent_response", "intervention_result", "error") and pending and not pending.done():
+                    pending.set_result(kind)
+
+        receiver = asyncio.create_task(receive())
+        try:
+            while time.monotonic() < deadline:
+                pending = asyncio.get_running_loop().create_future()
+                if rng.random() < args.chat_ratio:
+                    request = {"type": "chat", "message": "find python jobs"}
+                else:
+                    request = {"type": "intervention", "action": {"action": rng.choice(["screenshot", "click"])}}
+                start = time.perf_counter()
+                await ws.send(json.dumps(request))
+                try:
+                    kind = await asyncio.wait_for(pending, args.timeout)
+                    results["reply_ms"].append((time.perf_counter() - start) * 1000)
+                    results["errors"] += kind == "error"
+                except asyncio.TimeoutError:
+                    results["timeouts"] += 1
+                await asyncio.sleep(rng.expovariate(1 / args.think))
+            # Let broadcasts still in flight arrive before counting drops
+            await asyncio.sleep(args.drain)
+        finally:
+            receiver.cancel()
+
+
+def _percentile(values: list, q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def run_level(port: int, clients: int, args) -> dict:
+    base = f"http://127.0.0.1:{port}"
+    await asyncio.to_thread(urllib.request.urlopen, urllib.request.Request(base + "/api/session/create", method="POST"))
+    before = await asyncio.to_thread(_get_json, base + "/_load/stats")
+
+    results = {"frames": 0, "frame_ms": [], "reply_ms": [], "timeouts": 0, "errors": 0}
+    start = time.monotonic()
+    deadline = start + args.duration
+    outcomes = await asyncio.gather(
+        *(run_client(f"ws://127.0.0.1:{port}/ws", deadline, args, results) for _ in range(clients)),
+        return_exceptions=True,
+    )
+    elapsed = time.monotonic() - start - args.drain
+
+    await asyncio.sleep(0.5)
+    after = await asyncio.to_thread(_get_json, base + "/_load/stats")
+    # Every client is connected for the whole run, so each should see every broadcast frame
+    expected = (after["frames"] - before["frames"]) * clients
+    return {
+        "clients": clients,
+        "failed_clients": sum(isinstance(outcome, Exception) for outcome in outcomes),
+        "replies_per_s": round(len(results["reply_ms"]) / elapsed, 1),
+        "frames_per_s": round(results["frames"] / elapsed, 1),
+        "reply_p50_ms": round(_percentile(results["reply_ms"], 0.5), 1),
+        "reply_p99_ms": round(_percentile(results["reply_ms"], 0.99), 1),
+        "frame_p50_ms": round(_percentile(results["frame_ms"], 0.5), 1),
+        "frame_p99_ms": round(_percentile(results["frame_ms"], 0.99), 1),
+        "frames_expected": expected,
+        "frames_dropped": max(0, expected - results["frames"]),
+        "drop_rate": round(max(0, expected - results["frames"]) / expected, 4) if expected else 0.0,
+        "timeouts": results["timeouts"],
+        "errors": results["errors"],
+        "rss_growth_mb": round((after["rss_kb"] - before["rss_kb"]) / 1024, 1),
+        "leaked_websockets": after["websockets"],
+    }
+
+
+def _violations(level: dict, args) -> list:
+    found = []
+    if args.max_p99_ms is not None and level["frame_p99_ms"] > args.max_p99_ms:
+        found.append(f"frame p99 {level['frame_p99_ms']} ms > {args.max_p99_ms} ms")
+    if args.max_drop_rate is not None and level["drop_rate"] > args.max_drop_rate:
+        found.append(f"drop rate {level['drop_rate']} > {args.max_drop_rate}")
+    if args.max_rss_growth_mb is not None and level["rss_growth_mb"] > args.max_rss_growth_mb:
+        found.append(f"RSS growth {level['rss_growth_mb']} MB > {args.max_rss_growth_mb} MB")
+    if level["failed_clients"] or level["timeouts"] or level["leaked_websockets"]:
+        found.append("failed clients, reply timeouts or leaked websockets")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 50, 100], help="Concurrent /ws clients per level")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds of load per level")
+    parser.add_argument("--think", type=float, default=1.0, help="Mean seconds between a client's messages")
+    parser.add_argument("--chat-ratio", type=float, default=0.7, help="Share of chat vs intervention messages")
+    parser.add_argument("--llm-ms", type=float, default=300.0, help="Stand-in model latency per agent turn")
+    parser.add_argument("--elements", type=int, default=60, help="SOM elements drawn on stand-in frames")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds before a reply counts as timed out")
+    parser.add_argument("--drain", type=float, default=2.0, help="Seconds to wait for in-flight frames after the run")
+    parser.add_argument("--json", action="store_true", help="Print one JSON object per level")
+    parser.add_argument("--max-p99-ms", type=float, help="Fail if frame delivery p99 exceeds this")
+    parser.add_argument("--max-drop-rate", type=float, help="Fail if the dropped-frame rate exceeds this")
+    parser.add_argument("--max-rss-growth-mb", type=float, help="Fail if server RSS grows more than this per level")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.llm_ms, args.elements)
+        return
+
+    proc, port = start_server(args)
+    failures = []
+    try:
+        if not args.json:
+            print(f"{'clients':>7} {'replies/s':>9} {'frames/s':>9} {'reply p50/p99':>15} {'frame p50/p99':>15} "
+                  f"{'dropped':>9} {'rss +MB':>8}")
+        for clients in args.clients:
+            level = asyncio.run(run_level(port, clients, args))
+            if args.json:
+                print(json.dumps(level))
+            else:
+                print(f"{clients:>7} {level['replies_per_s']:>9} {level['frames_per_s']:>9} "
+                      f"{level['reply_p50_ms']:>7}/{level['reply_p99_ms']:<7} {level['frame_p50_ms']:>7}/{level['frame_p99_ms']:<7} "
+                      f"{level['frames_dropped']:>9} {level['rss_growth_mb']:>8}")
+            failures += [f"{clients} clients: {problem}" for problem in _violations(level, args)]
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
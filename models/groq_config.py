@@ -4,7 +4,11 @@ Optimized for rate limits and token budgets using the full model arsenal.
 """
 
 import os
-from google.adk.models.lite_llm import LiteLlm
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # LiteLlm pulls in litellm (slow to import); it is loaded when the first model is built
+    from .pooled_lite_llm import PooledLiteLlm
 
 # Full definition of available models
 MODEL_REGISTRY = {
@@ -61,9 +65,12 @@ GROQ_MODELS = {
 }
 
 
-def get_fast_model() -> LiteLlm:
+def get_fast_model() -> "PooledLiteLlm":
     """Get the primary model for orchestration (Root Agent)."""
-    return LiteLlm(
+    from .pooled_lite_llm import PooledLiteLlm
+
+    return PooledLiteLlm(
+        role="orchestrator",
         model=GROQ_MODELS["orchestrator"]["primary"],
         api_key=os.getenv("GROQ_API_KEY"),
         fallbacks=[
@@ -73,9 +80,12 @@ def get_fast_model() -> LiteLlm:
         ]
     )
 
-def get_reasoning_model() -> LiteLlm:
+def get_reasoning_model() -> "PooledLiteLlm":
     """Get the primary model for complex tasks (Ops Agent)."""
-    return LiteLlm(
+    from .pooled_lite_llm import PooledLiteLlm
+
+    return PooledLiteLlm(
+        role="reasoning",
         model=GROQ_MODELS["reasoning"]["primary"],
         api_key=os.getenv("GROQ_API_KEY"),
         fallbacks=[
@@ -85,16 +95,22 @@ def get_reasoning_model() -> LiteLlm:
         ]
     )
 
-def get_vision_model() -> LiteLlm:
+def get_vision_model() -> "PooledLiteLlm":
     """Get the primary vision model (Vision Agent)."""
-    return LiteLlm(
+    from .pooled_lite_llm import PooledLiteLlm
+
+    return PooledLiteLlm(
+        role="vision",
         model=GROQ_MODELS["vision"]["primary"],
         api_key=os.getenv("GROQ_API_KEY")
     )
 
-def get_research_model() -> LiteLlm:
+def get_research_model() -> "PooledLiteLlm":
     """Get the primary research model (Scout Agent)."""
-    return LiteLlm(
+    from .pooled_lite_llm import PooledLiteLlm
+
+    return PooledLiteLlm(
+        role="research",
         model=GROQ_MODELS["research"]["primary"],
         api_key=os.getenv("GROQ_API_KEY"),
         fallbacks=[
@@ -103,9 +119,20 @@ def get_research_model() -> LiteLlm:
         ]
     )
 
-def get_parser_model() -> LiteLlm:
+def get_parser_model() -> "PooledLiteLlm":
     """Get the fast model for CV parsing."""
-    return LiteLlm(
+    from .pooled_lite_llm import PooledLiteLlm
+
+    return PooledLiteLlm(
+        role="parser",
         model=GROQ_MODELS["parser"]["primary"],
         api_key=os.getenv("GROQ_API_KEY")
     )
+
+
+def fallback_chain(model: str) -> list:
+    """Primary-first model chain of the role whose primary is `model` (just [model] if unknown)."""
+    for role in GROQ_MODELS.values():
+        if role["primary"] == model:
+            return [role[tier] for tier in ("primary", "secondary", "tertiary", "fallback") if tier in role]
+    return [model]
@@ -0,0 +1,190 @@
+"""
+Shared LLM Client
+One pooled keep-alive HTTP client for all Groq traffic (agents and the CV parser),
+a global concurrency cap that hands free slots to the most interactive role first,
+and request timeouts. litellm's groq provider ignores `litellm.aclient_session` and
+caches its own clients, so every call passes the shared pool as `client=` (see get_handler).
+"""
+
+import asyncio
+import contextlib
+import heapq
+import importlib.util
+import itertools
+import os
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import httpx
+    from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+
+# Connections kept to the provider (keep-alive avoids a TLS handshake per model call)
+MAX_CONNECTIONS = int(os.getenv("COMMUTER_LLM_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE = int(os.getenv("COMMUTER_LLM_MAX_KEEPALIVE", "10"))
+KEEPALIVE_EXPIRY = 120.0
+
+# Model calls in flight across all agents; further calls queue by role priority
+CONCURRENCY = int(os.getenv("COMMUTER_LLM_CONCURRENCY", "8"))
+
+# Seconds before a model call is abandoned (litellm then tries the next fallback)
+TIMEOUT = float(os.getenv("COMMUTER_LLM_TIMEOUT", "60"))
+CONNECT_TIMEOUT = 10.0
+
+# Lower runs first: the orchestrator answers the user, CV parsing can wait
+ROLE_PRIORITY = {
+    "orchestrator": 0,
+    "vision": 1,
+    "reasoning": 1,
+    "research": 2,
+    "parser": 3,
+}
+
+_http_client: Optional["httpx.AsyncClient"] = None
+_handler: Optional["AsyncHTTPHandler"] = None
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """The shared pooled client, installed as litellm's async session on first use."""
+    global _http_client
+    if _http_client is None:
+        import httpx
+        import litellm
+
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(TIMEOUT, connect=CONNECT_TIMEOUT),
+            # HTTP/2 multiplexes calls over one connection; needs the optional h2 package
+            http2=importlib.util.find_spec("h2") is not None,
+        )
+        # Still honoured by litellm's OpenAI-SDK based providers
+        litellm.aclient_session = _http_client
+    return _http_client
+
+
+def get_handler() -> "AsyncHTTPHandler":
+    """litellm HTTP handler backed by the shared client; pass it as `client=` to litellm calls."""
+    global _handler
+    if _handler is None:
+        from litellm.llms.custom_httpx.http_handler import AsyncHTTPHandler
+
+        class SharedClientHandler(AsyncHTTPHandler):
+            def create_client(self, *args, **kwargs) -> "httpx.AsyncClient":
+                return get_http_client()
+
+        _handler = SharedClientHandler(timeout=TIMEOUT, client_alias="commuter-shared")
+    return _handler
+
+
+async def close_http_client():
+    global _http_client, _handler
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        _handler = None
+
+
+class PrioritySlots:
+    """Concurrency cap whose free slots go to the waiting caller with the lowest priority number."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters: list = []
+        self._arrivals = itertools.count()
+
+    async def acquire(self, priority: int):
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._arrivals), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled; pass it on
+                self.release()
+            raise
+
+    def release(self):
+        while self._waiters:
+            _priority, _arrival, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Hand the slot over directly; in_flight stays the same
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @property
+    def queued(self) -> int:
+        return sum(not future.done() for _p, _a, future in self._waiters)
+
+
+_slots = PrioritySlots(CONCURRENCY)
+_waits: Dict[str, deque] = {role: deque(maxlen=200) for role in ROLE_PRIORITY}
+_stats = {"calls": 0, "timeouts": 0, "errors": 0, "max_in_flight": 0, "max_queued": 0}
+
+
+@contextlib.asynccontextmanager
+async def llm_slot(role: str):
+    """Hold one of the global model-call slots for the duration of a call."""
+    get_http_client()
+    start = time.perf_counter()
+    _stats["max_queued"] = max(_stats["max_queued"], _slots.queued + 1)
+    await _slots.acquire(ROLE_PRIORITY.get(role, max(ROLE_PRIORITY.values())))
+    _waits.setdefault(role, deque(maxlen=200)).append((time.perf_counter() - start) * 1000)
+    _stats["calls"] += 1
+    _stats["max_in_flight"] = max(_stats["max_in_flight"], _slots.in_flight)
+    try:
+        yield
+    except asyncio.TimeoutError:
+        _stats["timeouts"] += 1
+        raise
+    except Exception as e:
+        _stats["timeouts" if "timeout" in type(e).__name__.lower() else "errors"] += 1
+        raise
+    finally:
+        _slots.release()
+
+
+async def acompletion(role: str, **kwargs):
+    """litellm.acompletion through the shared pool, slot queue and timeout."""
+    import litellm
+
+    kwargs.setdefault("client", get_handler())
+    async with llm_slot(role):
+        return await litellm.acompletion(timeout=TIMEOUT, **kwargs)
+
+
+def _pool_connections() -> dict:
+    # httpx does not expose its pool publicly; read httpcore's view defensively
+    pool = getattr(getattr(_http_client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for connection in connections if getattr(connection, "is_idle", lambda: False)())
+    return {"open": len(connections), "idle": idle, "active": len(connections) - idle}
+
+
+def get_llm_stats() -> dict:
+    def percentile(values, q):
+        ordered = sorted(values)
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 1) if ordered else None
+
+    return {
+        **_stats,
+        "concurrency_limit": CONCURRENCY,
+        "in_flight": _slots.in_flight,
+        "queued": _slots.queued,
+        "utilisation": round(_slots.in_flight / CONCURRENCY, 2),
+        "connections": _pool_connections() if _http_client is not None else None,
+        "max_connections": MAX_CONNECTIONS,
+        "slot_wait_ms": {
+            role: {"p50": percentile(waits, 0.5), "p95": percentile(waits, 0.95)}
+            for role, waits in _waits.items() if waits
+        },
+    }
@@ -0,0 +1,30 @@
+"""
+Pooled LiteLlm
+LiteLlm whose calls go through the shared client layer (models/llm_client.py):
+one keep-alive connection pool, a prioritized global concurrency cap and timeouts.
+"""
+
+from typing import AsyncGenerator
+
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.models.lite_llm import LiteLlm
+
+from .llm_client import TIMEOUT, get_handler, llm_slot
+
+
+class PooledLiteLlm(LiteLlm):
+    role: str = "orchestrator"
+
+    def __init__(self, model: str, role: str, **kwargs):
+        kwargs.setdefault("timeout", TIMEOUT)
+        # Forwarded to every litellm call, so agent traffic uses the shared pool
+        kwargs.setdefault("client", get_handler())
+        super().__init__(model=model, **kwargs)
+        self.role = role
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        async with llm_slot(self.role):
+            async for response in super().generate_content_async(llm_request, stream):
+                yield response
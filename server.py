@@ -8,24 +8,23 @@ import asyncio
 import json
 import base64
 import io
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
-import litellm 
-from pypdf import PdfReader
-
-from agents.root.agent import root_agent
 from models.groq_config import GROQ_MODELS
+from static_assets import get_assets
+from tools.action_trace import record_action
+from tools.browser_broker import BROWSER_WORKERS, start_broker, stop_broker, get_broker_stats, set_current_session
+from tools.browser_pool import start_pool, stop_pool, get_pool_stats
+from tools.pacing import BATCH, INTERACTIVE, set_priority
+from tools.event_log import EVENT_LOG_ENABLED, flush_async as flush_event_log
 from tools.browser_tools import (
     set_screenshot_callback,
+    set_action_callback,
     set_intervention_mode,
     is_intervention_mode,
     click_element,
@@ -34,42 +33,114 @@ from tools.browser_tools import (
     close_browser,
 )
 
+if TYPE_CHECKING:
+    # google.adk, litellm and the agent tree are heavy; they load on first use (see get_runner)
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+
 APP_NAME = "project_commuter"
-session_service = InMemorySessionService()
-runner: Optional[Runner] = None
+
+# Build the agent tree in the background right after startup instead of on the first chat
+PRELOAD_AGENTS = os.environ.get("COMMUTER_PRELOAD_AGENTS", "1") == "1"
+
+_session_service: Optional["InMemorySessionService"] = None
+runner: Optional["Runner"] = None
+_runner_task: Optional[asyncio.Task] = None
 active_websockets: list[WebSocket] = []
 current_session_id: Optional[str] = None
 current_user_id: str = "default_user"
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    global runner
-    runner = Runner(
+def get_session_service() -> "InMemorySessionService":
+    global _session_service
+    if _session_service is None:
+        from google.adk.sessions import InMemorySessionService
+        _session_service = InMemorySessionService()
+    return _session_service
+
+
+def _build_runner() -> "Runner":
+    from google.adk.runners import Runner
+    from agents.root.agent import root_agent
+    
+    plugins = []
+    if EVENT_LOG_ENABLED:
+        from agents.event_log_plugin import EventLogPlugin
+        plugins.append(EventLogPlugin())
+    
+    from agents.vision.speculative import SPECULATIVE_VISION, SpeculativeVisionPlugin
+    if SPECULATIVE_VISION != "off":
+        plugins.append(SpeculativeVisionPlugin())
+    
+    return Runner(
         agent=root_agent,
         app_name=APP_NAME,
-        session_service=session_service,
+        session_service=get_session_service(),
+        plugins=plugins,
     )
+
+
+async def get_runner() -> "Runner":
+    """Build the agent tree on first use. Imports run in a thread so the event loop keeps serving."""
+    global runner, _runner_task
+    if runner is None:
+        if _runner_task is None:
+            _runner_task = asyncio.create_task(asyncio.to_thread(_build_runner))
+        try:
+            runner = await _runner_task
+        except Exception:
+            _runner_task = None
+            raise
+    return runner
+
+
+async def _preload_agents():
+    try:
+        await get_runner()
+    except Exception as e:
+        print(f"Agent preload failed (will retry on first chat): {str(e)}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if PRELOAD_AGENTS:
+        asyncio.create_task(_preload_agents())
     
-    async def broadcast_screenshot(screenshot_base64: str):
+    async def broadcast_screenshot(screenshot_base64: str, mime: str):
         for ws in active_websockets:
             try:
                 await ws.send_json({
                     "type": "screenshot",
-                    "data": screenshot_base64
+                    "data": screenshot_base64,
+                    "mime": mime
                 })
             except:
                 pass
     
     set_screenshot_callback(broadcast_screenshot)
+    set_action_callback(record_action)
+    
+    # Hash and precompress the dashboard assets once, before the first page load
+    get_assets()
+    
+    if BROWSER_WORKERS:
+        # Browser tools run in worker processes (each pre-launches its own Chrome)
+        await start_broker()
+    else:
+        # Pre-launch Chrome so the first agent turn doesn't pay its startup time
+        await start_pool()
     
     yield
     
+    await stop_broker()
+    await stop_pool()
     await close_browser()
+    await flush_event_log()
+    from models.llm_client import close_http_client
+    await close_http_client()
 
 
 app = FastAPI(title="Project Commuter", lifespan=lifespan)
-app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
 class ChatMessage(BaseModel):
@@ -86,8 +157,17 @@ class InterventionAction(BaseModel):
 
 
 @app.get("/")
-async def root():
-    return FileResponse("static/index.html")
+async def root(request: Request):
+    """Dashboard page; asset links point at content-hashed, immutable URLs."""
+    assets = get_assets()
+    return assets.respond(request, assets.index)
+
+
+@app.get("/static/{path:path}")
+async def static_file(path: str, request: Request):
+    """Precompressed static assets (see static_assets.py)."""
+    assets = get_assets()
+    return assets.respond(request, assets.assets.get(path))
 
 
 @app.post("/api/session/create")
@@ -110,7 +190,7 @@ async def create_session():
         "discovered_jobs": []
     }
     
-    session = await session_service.create_session(
+    session = await get_session_service().create_session(
         app_name=APP_NAME,
         user_id=current_user_id,
         session_id=session_id,
@@ -130,6 +210,9 @@ async def upload_cv(file: UploadFile = File(...)):
         await create_session()
         
     try:
+        from pypdf import PdfReader
+        from models import llm_client
+        
         # 1. Extract Text
         contents = await file.read()
         pdf_file = io.BytesIO(contents)
@@ -156,7 +239,8 @@ async def upload_cv(file: UploadFile = File(...)):
         Return ONLY valid JSON.
         """
         
-        response = litellm.completion(
+        response = await llm_client.acompletion(
+            role="parser",
             model=GROQ_MODELS["parser"]["primary"],
             messages=[{"role": "user", "content": prompt}],
             response_format={"type": "json_object"}
@@ -165,7 +249,7 @@ async def upload_cv(file: UploadFile = File(...)):
         extracted_data = json.loads(response.choices[0].message.content)
         
         # 3. Update Session State DIRECTLY
-        session = await session_service.get_session(
+        session = await get_session_service().get_session(
             app_name=APP_NAME,
             user_id=current_user_id,
             session_id=current_session_id
@@ -196,13 +280,16 @@ async def chat(message: ChatMessage):
         await create_session()
     
     try:
+        from google.genai import types
+        
         content = types.Content(
             role="user",
             parts=[types.Part.from_text(text=message.message)]
         )
         
         response_text = ""
-        async for event in runner.run_async(
+        set_current_session(current_session_id)
+        async for event in (await get_runner()).run_async(
             user_id=current_user_id,
             session_id=current_session_id,
             new_message=content
@@ -212,6 +299,7 @@ async def chat(message: ChatMessage):
                     if hasattr(part, 'text') and part.text:
                         response_text += part.text
         
+        await flush_event_log(current_session_id)
         return {
             "status": "success",
             "response": response_text,
@@ -224,6 +312,9 @@ async def chat(message: ChatMessage):
 @app.post("/api/intervention/action")
 async def intervention_action(action: InterventionAction):
     """Handle user actions during intervention mode."""
+    set_current_session(current_session_id)
+    # The user is watching: their actions go ahead of queued agent navigation
+    set_priority(INTERACTIVE)
     try:
         if action.action == "click":
             result = await click_element(x=action.x, y=action.y, selector=action.selector)
@@ -243,6 +334,8 @@ async def intervention_action(action: InterventionAction):
         return result
     except Exception as e:
         return {"status": "error", "error": str(e)}
+    finally:
+        set_priority(BATCH)
 
 
 @app.get("/api/intervention/status")
@@ -250,6 +343,61 @@ async def intervention_status():
     return {"intervention_mode": is_intervention_mode()}
 
 
+@app.get("/healthz")
+async def healthz():
+    """Readiness probe: answers as soon as the app is up, agents may still be loading."""
+    return {"status": "ok", "agents_loaded": runner is not None}
+
+
+@app.get("/api/browser/pool")
+async def browser_pool_status():
+    """Cold vs warm browser start timings, pool health and job-page prefetch hits, for sizing the pool."""
+    from tools.prefetch import get_prefetch_stats
+    return {**get_pool_stats(), "prefetch": get_prefetch_stats()}
+
+
+@app.get("/api/browser/workers")
+async def browser_workers_status():
+    """Per-worker sessions, call counts and busy time when browser workers are enabled."""
+    return get_broker_stats()
+
+
+@app.get("/api/llm")
+async def llm_status():
+    """Model-call slot usage, queueing per role and provider connection pool utilisation."""
+    from models.llm_client import get_llm_stats
+    return get_llm_stats()
+
+
+@app.get("/api/prompts")
+async def prompt_status():
+    """Instruction token counts (static part, templated state, truncated fields) of each agent's last call."""
+    if runner is None:
+        return {}
+    from agents.prompt_budget import get_prompt_stats
+    return get_prompt_stats()
+
+
+@app.get("/api/vision")
+async def vision_status():
+    """Vision answer cache and speculative pre-analysis counters."""
+    from tools.frame_cache import vision_cache
+    if runner is None:
+        return {"cache": vision_cache.stats(), "speculative": None}
+    from agents.vision.speculative import get_speculation_stats
+    return {"cache": vision_cache.stats(), "speculative": get_speculation_stats()}
+
+
+@app.get("/api/browser/pacing")
+async def browser_pacing_status():
+    """Navigation scheduler queue depth, wait times and challenge backoff (per worker when enabled)."""
+    from tools.browser_broker import call_all, is_active
+    from tools.pacing import scheduler
+    if is_active():
+        return {"workers": await call_all("tools.pacing:pacing_status", {})}
+    return scheduler.stats()
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket for real-time updates with CLEAN LOGS."""
@@ -274,9 +422,12 @@ async def websocket_endpoint(websocket: WebSocket):
                     if not current_session_id:
                         await create_session()
                     
+                    from google.genai import types
+                    
                     content = types.Content(role="user", parts=[types.Part.from_text(text=message)])
                     
-                    async for event in runner.run_async(
+                    set_current_session(current_session_id)
+                    async for event in (await get_runner()).run_async(
                         user_id=current_user_id,
                         session_id=current_session_id,
                         new_message=content
@@ -322,6 +473,8 @@ async def websocket_endpoint(websocket: WebSocket):
                                     "type": "agent_action",
                                     "actions": f"Delegating to {event.transfer_to_agent}"
                                 })
+                    
+                    await flush_event_log(current_session_id)
 
                 except Exception as e:
                     await websocket.send_json({"type": "error", "message": str(e)})
@@ -44,7 +44,7 @@ class ProjectCommuter {
     handleMessage(data) {
         switch (data.type) {
             case 'screenshot':
-                this.updateScreenshot(data.data);
+                this.updateScreenshot(data.data, data.mime);
                 break;
             case 'thinking':
                 this.showThinkingIndicator(data.message);
@@ -221,11 +221,12 @@ class ProjectCommuter {
         container.scrollTop = container.scrollHeight;
     }
 
-    updateScreenshot(base64Data) {
+    updateScreenshot(base64Data, mime) {
         const img = document.getElementById('screenshot-img');
         const placeholder = document.querySelector('.placeholder');
         if (img) {
-            img.src = `data:image/png;base64,${base64Data}`;
+            // PNG by default, JPEG when the server runs with COMMUTER_SOM_OUTPUT=jpeg
+            img.src = `data:${mime};base64,${base64Data}`;
             img.classList.remove('hidden');
         }
         if (placeholder) placeholder.style.display = 'none';
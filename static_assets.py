@@ -0,0 +1,138 @@
+"""
+Static Asset Pipeline
+Build-free: at startup every file under static/ is read once, content-hashed and
+precompressed (gzip, plus brotli when the optional `brotli` package is installed).
+Hashed URLs are served with immutable cache headers; index.html and unhashed URLs
+are revalidated with ETags. Everything is kept in memory, nothing is written to disk.
+"""
+
+import copy
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip alone still covers every browser
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+URL_PREFIX = "/static/"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+# Compressing already-compressed formats only costs CPU
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+# Variants smaller than this are not worth a Content-Encoding round trip
+MIN_COMPRESS_BYTES = 256
+
+
+class Asset:
+    def __init__(self, body: bytes, content_type: str, cache_control: str):
+        self.digest = hashlib.sha256(body).hexdigest()[:12]
+        self.content_type = content_type
+        self.cache_control = cache_control
+        # Encoding -> body; identity is always present
+        self.variants: Dict[str, bytes] = {"identity": body}
+
+        if len(body) >= MIN_COMPRESS_BYTES and content_type.startswith(COMPRESSIBLE_TYPES):
+            # mtime=0 keeps the gzip bytes (and so the ETag) stable across restarts
+            self.variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=11)
+
+    def etag(self, encoding: str) -> str:
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+
+class StaticAssets:
+    def __init__(self, root: str = STATIC_DIR):
+        self.root = root
+        self.assets: Dict[str, Asset] = {}
+        self.hashed_names: Dict[str, str] = {}
+        self.index: Optional[Asset] = None
+
+    def build(self):
+        for directory, _dirs, files in os.walk(self.root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if name == "index.html":
+                    continue
+                with open(path, "rb") as f:
+                    body = f.read()
+                content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+                if content_type.startswith("text/") or content_type == "application/javascript":
+                    content_type += "; charset=utf-8"
+
+                asset = Asset(body, content_type, IMMUTABLE)
+                stem, ext = os.path.splitext(name)
+                hashed = f"{stem}.{asset.digest}{ext}"
+                self.assets[hashed] = asset
+                # The plain name keeps working for anything that still links it, but must revalidate
+                plain = copy.copy(asset)
+                plain.cache_control = REVALIDATE
+                self.assets[name] = plain
+                self.hashed_names[name] = hashed
+
+        with open(os.path.join(self.root, "index.html"), "rb") as f:
+            html = f.read().decode("utf-8")
+        html = re.sub(
+            re.escape(URL_PREFIX) + r"([\w./-]+)",
+            lambda match: URL_PREFIX + self.hashed_names.get(match.group(1), match.group(1)),
+            html,
+        )
+        self.index = Asset(html.encode("utf-8"), "text/html; charset=utf-8", REVALIDATE)
+
+    def respond(self, request: Request, asset: Optional[Asset]) -> Response:
+        if asset is None:
+            return Response(status_code=404)
+
+        accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding = next((name for name in ("br", "gzip") if name in asset.variants and name in accepted), "identity")
+        headers = {
+            "Cache-Control": asset.cache_control,
+            "ETag": asset.etag(encoding),
+            "Vary": "Accept-Encoding",
+        }
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+
+        if headers["ETag"] in _etags(request.headers.get("if-none-match", "")):
+            return Response(status_code=304, headers=headers)
+        return Response(asset.variants[encoding], media_type=asset.content_type, headers=headers)
+
+
+def _accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def _etags(header: str) -> set:
+    # Weak validators match too for GET (RFC 9110 weak comparison)
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
+
+_assets: Optional[StaticAssets] = None
+
+
+def get_assets() -> StaticAssets:
+    """Build the asset table on first use (normally during server startup)."""
+    global _assets
+    if _assets is None:
+        assets = StaticAssets()
+        assets.build()
+        _assets = assets
+    return _assets
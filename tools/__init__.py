@@ -1,30 +1,32 @@
 """
 Project Commuter - Agent Tools
 Browser automation, search, and CV parsing tools
+
+Exports are resolved lazily so importing one submodule (e.g. from server.py)
+does not pull in every tool's dependencies (ddgs, PIL, ...).
 """
 
-from .browser_tools import (
-    navigate_to_url,
-    click_element,
-    type_text,
-    take_screenshot,
-    scroll_page,
-)
-from .search_tools import (
-    search_jobs, 
-    search_web, 
-    search_company_info, 
-    search_job_boards
-)
+import importlib
+
+_EXPORTS = {
+    "navigate_to_url": ".browser_tools",
+    "click_element": ".browser_tools",
+    "type_text": ".browser_tools",
+    "take_screenshot": ".browser_tools",
+    "scroll_page": ".browser_tools",
+    "perform_actions": ".browser_tools",
+    "replay_application": ".action_trace",
+    "finish_application": ".action_trace",
+    "search_jobs": ".search_tools",
+    "search_web": ".search_tools",
+    "search_company_info": ".search_tools",
+    "search_job_boards": ".search_tools",
+}
+
+__all__ = list(_EXPORTS)
+
 
-__all__ = [
-    "navigate_to_url",
-    "click_element", 
-    "type_text",
-    "take_screenshot",
-    "scroll_page",
-    "search_jobs",
-    "search_web",
-    "search_company_info",
-    "search_job_boards"
-]
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,193 @@
+"""
+Action Trace Recording & Replay
+Records successful Easy Apply flows and replays them with label matching
+"""
+
+import time
+from typing import Optional, Dict, List
+
+from .browser_broker import get_current_session, routed
+from .browser_tools import perform_actions, get_som_map, get_page_state
+from .page_state import INTERVENTION_REQUIRED, LOGIN_DETECTED, UNKNOWN
+
+# Maximum number of successful flows kept in memory (oldest evicted first)
+MAX_TRACES = 50
+
+# Page states that never belong inside an application flow; replay stops when one appears
+_ABORT_STATES = (LOGIN_DETECTED, INTERVENTION_REQUIRED)
+
+# Traces currently being recorded, per session (each starts on a navigation)
+_active_traces: Dict[str, dict] = {}
+
+# Successful traces keyed by flow signature
+# Format: { "BUTTON:easy apply|INPUT:phone|...": {"steps": [...], "url": "...", "replays": 0} }
+_traces: Dict[str, dict] = {}
+
+
+def _normalize_label(label: str) -> str:
+    return " ".join((label or "").lower().split())
+
+
+def _element_label(element: dict) -> str:
+    # Accessible label from the tracker (label[for], placeholder, name, ...), visible text as a fallback
+    return _normalize_label(element.get("label") or element.get("desc", ""))
+
+
+def _flow_signature(steps: List[dict]) -> str:
+    """Identify a flow by the ordered element labels it touched."""
+    return "|".join(f"{step['tag']}:{step['label']}" for step in steps)
+
+
+def record_action(action: str, element: Optional[dict] = None, text: Optional[str] = None, url: str = ""):
+    """
+    Action listener for browser_tools.set_action_callback.
+    A navigation starts a new trace; clicks and typing are appended to it.
+    """
+    session = get_current_session()
+    if action == "navigate":
+        _active_traces[session] = {"url": url, "started_at": time.time(), "steps": []}
+        return
+
+    trace = _active_traces.get(session)
+    if trace is None or not element:
+        return
+
+    trace["steps"].append({
+        "action": action,
+        "label": _element_label(element),
+        "tag": element.get("tag", ""),
+        "in_dialog": element.get("in_dialog", False),
+        # State of the page the action was taken on, checked again before replaying the step
+        "page_state": get_page_state().get("state", UNKNOWN),
+        "x": element.get("x", 0),
+        "y": element.get("y", 0),
+        "text": text,
+        "url": url,
+    })
+
+
+def finish_trace(succeeded: bool) -> dict:
+    """Close the active trace. Successful traces are kept for later replay."""
+    trace = _active_traces.pop(get_current_session(), None)
+
+    if trace is None or not trace["steps"]:
+        return {"status": "error", "error": "No recorded actions to save"}
+
+    if not succeeded:
+        return {"status": "success", "saved": False, "steps": len(trace["steps"])}
+
+    signature = _flow_signature(trace["steps"])
+    previous = _traces.pop(signature, None)
+    trace["replays"] = previous["replays"] if previous else 0
+    trace["duration_s"] = round(time.time() - trace["started_at"], 2)
+    _traces[signature] = trace
+
+    while len(_traces) > MAX_TRACES:
+        _traces.pop(next(iter(_traces)))
+
+    return {"status": "success", "saved": True, "steps": len(trace["steps"])}
+
+
+def _match_element(step: dict, som_map: Dict[str, dict]) -> Optional[str]:
+    """
+    Find the one current SOM ID whose tag and label match a recorded step.
+    Unlabeled steps and labels shared by several elements never match: guessing
+    could type one job's answers into another job's fields.
+    """
+    if not step["label"]:
+        return None
+    candidates = [
+        element_id for element_id, el in som_map.items()
+        if el.get("tag") == step["tag"]
+        and el.get("in_dialog", False) == step.get("in_dialog", False)
+        and _element_label(el) == step["label"]
+    ]
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def _unexpected_state(step: dict) -> Optional[str]:
+    """Page state that contradicts the recorded step, if any."""
+    state = get_page_state().get("state", UNKNOWN)
+    if state in _ABORT_STATES:
+        return state
+    expected = step.get("page_state", UNKNOWN)
+    if UNKNOWN not in (state, expected) and state != expected:
+        return state
+    return None
+
+
+def find_trace(som_map: Dict[str, dict]) -> Optional[dict]:
+    """Pick the most replayed (then most recent) trace whose first step is visible on the page."""
+    matches = [trace for trace in _traces.values() if _match_element(trace["steps"][0], som_map)]
+    if not matches:
+        return None
+    return max(matches, key=lambda trace: (trace["replays"], trace["started_at"]))
+
+
+@routed
+async def replay_application() -> dict:
+    """
+    Replay a previously successful Easy Apply flow on the current page.
+    Each step is matched by element label and verified before and after acting; unlabeled or
+    ambiguous fields, unexpected pages and actions that did not take effect stop the replay.
+    If a step diverges, returns status "diverged" so you can continue manually from the latest screenshot.
+    """
+    try:
+        trace = find_trace(get_som_map())
+        if trace is None:
+            return {"status": "no_match", "message": "No recorded flow matches this page. Apply manually."}
+
+        result: dict = {}
+        for index, step in enumerate(trace["steps"]):
+            state = _unexpected_state(step)
+            if state is not None:
+                return {
+                    **result,
+                    "status": "diverged",
+                    "completed_steps": index,
+                    "expected_element": step["label"],
+                    "message": f"Step {index + 1} diverged: page is {state}, expected {step.get('page_state', UNKNOWN)}. Continue manually.",
+                }
+
+            element_id = _match_element(step, get_som_map())
+            if element_id is None:
+                return {
+                    **result,
+                    "status": "diverged",
+                    "completed_steps": index,
+                    "expected_element": step["label"],
+                    "message": f"Step {index + 1} diverged: no single element labelled '{step['label']}'. Continue manually.",
+                }
+
+            # One verified op per step: perform_actions JSON-encodes the value and checks it stuck
+            result = await perform_actions([{"op": step["action"], "element_id": element_id, "text": step["text"] or ""}])
+            outcome = (result.get("actions") or [{}])[0]
+            if result.get("status") != "success" or not outcome.get("ok"):
+                error = outcome.get("error") or result.get("error") or "action could not be verified"
+                return {
+                    **result,
+                    "status": "diverged",
+                    "completed_steps": index,
+                    "expected_element": step["label"],
+                    "message": f"Step {index + 1} ('{step['label']}') did not take effect: {error}. Continue manually.",
+                }
+
+        trace["replays"] += 1
+        return {
+            **result,
+            "status": "success",
+            "completed_steps": len(trace["steps"]),
+            "message": "Recorded flow replayed. Verify the confirmation, then call finish_application.",
+        }
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+@routed
+async def finish_application(succeeded: bool) -> dict:
+    """
+    Mark the current application as finished.
+    Call with succeeded=True once "Application sent" is confirmed so the flow can be replayed next time.
+    """
+    return finish_trace(succeeded)
+
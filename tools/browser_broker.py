@@ -0,0 +1,306 @@
+"""
+Browser Worker Broker
+Runs browser tools in worker processes (each owning its own Chrome and a few tabs)
+and routes calls to them over Unix sockets with sticky per-session assignment.
+
+With COMMUTER_BROWSER_WORKERS=0 (default) every tool runs in-process as before.
+"""
+
+import asyncio
+import contextvars
+import functools
+import importlib
+import inspect
+import itertools
+import json
+import multiprocessing
+import os
+import shutil
+import struct
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+# Number of browser worker processes; 0 keeps browser tools in the server process
+BROWSER_WORKERS = int(os.getenv("COMMUTER_BROWSER_WORKERS", "0"))
+
+# Seconds to wait for a freshly spawned worker to start listening
+WORKER_START_TIMEOUT = 30.0
+
+# Session a tool call belongs to (set by the server before running the agent)
+_session_var: contextvars.ContextVar = contextvars.ContextVar("commuter_session", default="default")
+
+
+def set_current_session(session_id: Optional[str]):
+    _session_var.set(session_id or "default")
+
+
+def get_current_session() -> str:
+    return _session_var.get()
+
+
+async def _send(writer: asyncio.StreamWriter, message: dict):
+    data = json.dumps(message).encode("utf-8")
+    # One write per frame so concurrent senders never interleave
+    writer.write(struct.pack("!I", len(data)) + data)
+    await writer.drain()
+
+
+async def _recv(reader: asyncio.StreamReader) -> dict:
+    header = await reader.readexactly(4)
+    return json.loads(await reader.readexactly(struct.unpack("!I", header)[0]))
+
+
+# ---------------------------------------------------------------------------
+# Worker process
+# ---------------------------------------------------------------------------
+
+def _worker_main(index: int, socket_path: str):
+    # Chrome locks its profile directory, so every worker needs its own
+    os.environ["COMMUTER_CHROME_PROFILE"] = f"chrome_profile_w{index}"
+    asyncio.run(_serve(socket_path))
+
+
+async def _serve(socket_path: str):
+    from . import action_trace, browser_pool, browser_tools, pacing
+
+    tabs: Dict[str, "browser_tools.TabState"] = {}
+    done = asyncio.Event()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        async def forward_screenshot(data: str, mime: str):
+            await _send(writer, {"event": "screenshot", "session": _session_var.get(), "data": data, "mime": mime})
+
+        browser_tools.set_screenshot_callback(forward_screenshot)
+        browser_tools.set_action_callback(action_trace.record_action)
+
+        async def run(message: dict):
+            # Each call runs in its own task, so session, tab state and priority are task-local
+            # and sessions on this worker overlap freely while one of them waits on a page load
+            session = message["session"]
+            if session not in tabs:
+                # The first session drives the main tab; later ones open a tab on first use
+                tabs[session] = browser_tools.TabState(own_tab=bool(tabs))
+            browser_tools.use_tab_state(tabs[session])
+            set_current_session(session)
+            pacing.set_priority(message.get("priority", pacing.BATCH))
+
+            start = time.perf_counter()
+            try:
+                module_name, function_name = message["tool"].split(":")
+                tool = getattr(importlib.import_module(module_name), function_name)
+                result = await tool(**message["args"])
+            except Exception as e:
+                result = {"status": "error", "error": str(e)}
+
+            await _send(writer, {
+                "id": message["id"],
+                "result": result,
+                "meta": {
+                    "frame_hash": browser_tools.get_last_frame_hash(),
+                    "page_state": browser_tools.get_page_state(),
+                    "worker_ms": round((time.perf_counter() - start) * 1000, 2),
+                },
+            })
+
+        while True:
+            try:
+                message = await _recv(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            if message.get("shutdown"):
+                break
+            asyncio.create_task(run(message))
+
+        await browser_pool.stop_pool()
+        await browser_tools.close_browser()
+        done.set()
+
+    server = await asyncio.start_unix_server(handle, path=socket_path)
+    if os.getenv("COMMUTER_PRELAUNCH_BROWSER", "1") == "1":
+        await browser_pool.start_pool()
+    async with server:
+        await done.wait()
+
+
+# ---------------------------------------------------------------------------
+# Broker (server process)
+# ---------------------------------------------------------------------------
+
+class _Worker:
+    def __init__(self, index: int, process, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.index = index
+        self.process = process
+        self.reader = reader
+        self.writer = writer
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.sessions: set = set()
+        self.calls = 0
+        self.busy_ms = 0.0
+        self.reader_task: Optional[asyncio.Task] = None
+
+
+_workers: List[_Worker] = []
+_assignments: Dict[str, _Worker] = {}
+_call_ids = itertools.count(1)
+_socket_dir: Optional[str] = None
+
+
+def is_active() -> bool:
+    """True in the server process when browser tools are served by worker processes."""
+    return bool(_workers)
+
+
+async def _connect(path: str, process) -> tuple:
+    deadline = time.monotonic() + WORKER_START_TIMEOUT
+    while True:
+        try:
+            return await asyncio.open_unix_connection(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if not process.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError(f"Browser worker failed to start ({path})")
+            await asyncio.sleep(0.1)
+
+
+async def _read_loop(worker: _Worker):
+    from . import browser_tools
+
+    while True:
+        try:
+            message = await _recv(worker.reader)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            break
+
+        if message.get("event") == "screenshot":
+            await browser_tools.emit_screenshot(message["data"], message["mime"])
+            continue
+
+        future = worker.pending.pop(message["id"], None)
+        if future and not future.done():
+            future.set_result(message)
+
+    for future in worker.pending.values():
+        if not future.done():
+            future.set_result({"result": {"status": "error", "error": f"Browser worker {worker.index} exited"}})
+    worker.pending.clear()
+
+
+async def start_broker(workers: int = BROWSER_WORKERS):
+    """Spawn `workers` browser worker processes and connect to them."""
+    global _socket_dir
+    if workers <= 0 or _workers:
+        return
+
+    context = multiprocessing.get_context("spawn")
+    _socket_dir = tempfile.mkdtemp(prefix="commuter-broker-")
+    for index in range(workers):
+        path = os.path.join(_socket_dir, f"worker-{index}.sock")
+        process = context.Process(target=_worker_main, args=(index, path), daemon=True)
+        process.start()
+        reader, writer = await _connect(path, process)
+        worker = _Worker(index, process, reader, writer)
+        worker.reader_task = asyncio.create_task(_read_loop(worker))
+        _workers.append(worker)
+
+
+async def stop_broker():
+    global _socket_dir
+    for worker in _workers:
+        try:
+            await _send(worker.writer, {"shutdown": True})
+            worker.writer.close()
+        except Exception:
+            pass
+    for worker in _workers:
+        await asyncio.to_thread(worker.process.join, 10)
+        if worker.process.is_alive():
+            worker.process.terminate()
+        if worker.reader_task:
+            worker.reader_task.cancel()
+    _workers.clear()
+    _assignments.clear()
+    if _socket_dir:
+        shutil.rmtree(_socket_dir, ignore_errors=True)
+        _socket_dir = None
+
+
+def worker_for(session_id: str) -> _Worker:
+    """Sticky routing: a session stays on the worker (and tab) that first served it."""
+    worker = _assignments.get(session_id)
+    if worker is None or not worker.process.is_alive():
+        live = [w for w in _workers if w.process.is_alive()] or _workers
+        worker = min(live, key=lambda w: len(w.sessions))
+        worker.sessions.add(session_id)
+        _assignments[session_id] = worker
+    return worker
+
+
+async def _call(worker: _Worker, session: str, tool: str, args: dict) -> dict:
+    from . import pacing
+
+    call_id = next(_call_ids)
+    future = asyncio.get_running_loop().create_future()
+    worker.pending[call_id] = future
+    worker.calls += 1
+
+    await _send(worker.writer, {
+        "id": call_id, "session": session, "tool": tool, "args": args, "priority": pacing.get_priority(),
+    })
+    reply = await future
+    worker.busy_ms += (reply.get("meta") or {}).get("worker_ms", 0)
+    return reply
+
+
+async def call_tool(tool: str, args: dict, session_id: Optional[str] = None) -> dict:
+    """Run `module:function` on the session's worker and return its result."""
+    from . import browser_tools
+
+    session = session_id or _session_var.get()
+    reply = await _call(worker_for(session), session, tool, args)
+
+    meta = reply.get("meta") or {}
+    if "frame_hash" in meta:
+        # Mirror what in-process callers (e.g. the vision cache) read from browser_tools
+        browser_tools.mirror_capture(meta["frame_hash"], meta["page_state"])
+    return reply["result"]
+
+
+async def call_all(tool: str, args: dict) -> List[dict]:
+    """Run `module:function` once on every live worker (e.g. to collect per-worker stats)."""
+    live = [worker for worker in _workers if worker.process.is_alive()]
+    replies = await asyncio.gather(*(_call(worker, "__broker__", tool, args) for worker in live))
+    return [{"worker": worker.index, **reply["result"]} for worker, reply in zip(live, replies)]
+
+
+def routed(fn):
+    """
+    Decorator for browser tools: runs in-process normally, or on the session's
+    worker when the broker is active. Signature and docstring are preserved for ADK.
+    """
+    tool = f"{fn.__module__}:{fn.__name__}"
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if not _workers:
+            return await fn(*args, **kwargs)
+        bound = inspect.signature(fn).bind(*args, **kwargs)
+        return await call_tool(tool, dict(bound.arguments))
+
+    return wrapper
+
+
+def get_broker_stats() -> dict:
+    return {
+        "workers": [
+            {
+                "index": worker.index,
+                "alive": worker.process.is_alive(),
+                "sessions": len(worker.sessions),
+                "calls": worker.calls,
+                "in_flight": len(worker.pending),
+                "busy_ms": round(worker.busy_ms, 1),
+            }
+            for worker in _workers
+        ],
+        "sessions": len(_assignments),
+    }
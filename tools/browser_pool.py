@@ -0,0 +1,150 @@
+"""
+Warm Browser Pool
+Pre-launches Chrome at server startup, keeps spare tabs warm and restarts crashed browsers
+"""
+
+import asyncio
+import os
+import time
+from typing import TYPE_CHECKING, List, Optional, Set
+
+from .browser_tools import (
+    get_browser,
+    get_page,
+    is_browser_running,
+    reset_browser,
+    get_launch_stats,
+)
+
+if TYPE_CHECKING:
+    import nodriver as uc
+
+# Launch Chrome during server startup instead of on the first tool call
+PRELAUNCH = os.getenv("COMMUTER_PRELAUNCH_BROWSER", "1") == "1"
+
+# Spare about:blank tabs kept open next to the main tab (one Chrome profile = one instance)
+WARM_TABS = int(os.getenv("COMMUTER_WARM_TABS", "1"))
+
+# Seconds between background health checks
+HEALTH_CHECK_INTERVAL = float(os.getenv("COMMUTER_BROWSER_HEALTH_INTERVAL", "30"))
+
+# A tab that takes longer than this to evaluate `1 + 1` is treated as hung
+HEALTH_CHECK_TIMEOUT = 5.0
+
+_warm_tabs: List["uc.Tab"] = []
+_health_task: Optional[asyncio.Task] = None
+# Running refills, referenced so they are not garbage-collected mid-run
+_refills: Set[asyncio.Task] = set()
+_stats = {
+    "warm_up_ms": None,
+    "health_checks": 0,
+    "failed_checks": 0,
+    "restarts": 0,
+    "tabs_served": 0,
+}
+
+
+async def warm_up():
+    """Launch Chrome (if needed), attach the main tab and top up the spare tabs."""
+    start = time.perf_counter()
+    browser = await get_browser()
+    page = await get_page()
+
+    _warm_tabs[:] = [tab for tab in _warm_tabs if not getattr(tab, "closed", False)]
+    opened = False
+    while len(_warm_tabs) < WARM_TABS:
+        _warm_tabs.append(await browser.get("about:blank", new_tab=True))
+        opened = True
+    if opened:
+        # Opening a tab focuses it; keep the tab being driven (and shown to the user) in front
+        await page.bring_to_front()
+
+    _stats["warm_up_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+
+async def acquire_tab() -> "uc.Tab":
+    """
+    Take a warm spare tab for a prefetch, a worker session's own tab or a replaced main tab.
+    Opens a cold one only if the pool is empty; the pool refills in the background.
+    """
+    _stats["tabs_served"] += 1
+    while _warm_tabs:
+        tab = _warm_tabs.pop()
+        if not getattr(tab, "closed", False):
+            task = asyncio.create_task(_refill())
+            _refills.add(task)
+            task.add_done_callback(_refills.discard)
+            return tab
+
+    browser = await get_browser()
+    return await browser.get("about:blank", new_tab=True)
+
+
+async def _refill():
+    try:
+        await warm_up()
+    except Exception as e:
+        print(f"Warm tab refill failed: {str(e)}")
+
+
+async def _is_healthy() -> bool:
+    # Probe any open tab without touching which tab a session drives (closed tabs are
+    # replaced by get_page() on the session's next call)
+    try:
+        browser = await get_browser()
+        tab = next(tab for tab in browser.tabs if not getattr(tab, "closed", False))
+        return await asyncio.wait_for(tab.evaluate("1 + 1"), HEALTH_CHECK_TIMEOUT) == 2
+    except Exception:
+        return False
+
+
+async def _health_loop():
+    while True:
+        await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+        # Nothing to check (or restart) until something has launched Chrome
+        if not is_browser_running():
+            continue
+        _stats["health_checks"] += 1
+        if await _is_healthy():
+            continue
+
+        _stats["failed_checks"] += 1
+        print("Browser health check failed, restarting Chrome")
+        try:
+            await reset_browser()
+            _warm_tabs.clear()
+            await warm_up()
+            _stats["restarts"] += 1
+        except Exception as e:
+            print(f"Browser restart failed: {str(e)}")
+
+
+async def _prelaunch():
+    try:
+        await warm_up()
+    except Exception as e:
+        print(f"Browser pre-launch failed (will launch on first use): {str(e)}")
+
+
+async def start_pool():
+    """Called from the server lifespan: pre-launch in the background and start health checks."""
+    global _health_task
+    if PRELAUNCH:
+        asyncio.create_task(_prelaunch())
+    _health_task = asyncio.create_task(_health_loop())
+
+
+async def stop_pool():
+    global _health_task
+    if _health_task:
+        _health_task.cancel()
+        _health_task = None
+
+
+def get_pool_stats() -> dict:
+    return {
+        **get_launch_stats(),
+        **_stats,
+        "warm_tabs": len(_warm_tabs),
+        "prelaunch": PRELAUNCH,
+    }
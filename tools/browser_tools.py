@@ -4,44 +4,183 @@ Includes Visual SOM (Set-of-Mark) for reliable clicking
 """
 
 import asyncio
-import base64
+import contextvars
 import io
+import json
 import os
 import tempfile
-from typing import Optional, Dict
-import nodriver as uc
-from PIL import Image, ImageDraw, ImageFont
+import time
+from typing import TYPE_CHECKING, Optional, Dict, List
+from PIL import Image
 
-_browser: Optional[uc.Browser] = None
-_page: Optional[uc.Tab] = None
+from .frame_cache import frame_hash, is_same_frame
+from .image_prep import prepare_for_model, region_of_interest
+from .page_state import SIGNALS_JS, UNKNOWN, classify_page_state
+from .som_render import encode_overlay, render_overlay
+from .som_tracker import SOM_TRACKER_JS, apply_som_delta
+from .browser_broker import routed
+from .pacing import paced
+
+if TYPE_CHECKING:
+    # nodriver (and its generated CDP bindings) is imported on first launch, not at server import
+    import nodriver as uc
+
+_browser: Optional["uc.Browser"] = None
 _intervention_mode: bool = False
 _screenshot_callback = None
+_action_callback = None
+
+# Serializes launches so a background pre-launch and the first tool call share one Chrome
+_browser_lock = asyncio.Lock()
+
+# Browser acquisition timings (see browser_pool.py)
+_launch_stats = {"cold_starts": 0, "last_cold_start_ms": None, "warm_acquires": 0, "last_warm_acquire_ms": None}
+
+
+
+class TabState:
+    """
+    Browser state of one tab: the page tools act on and what its last tagged capture saw.
+    In-process every session shares one; browser workers give each session its own.
+    """
+
+    def __init__(self, own_tab: bool = False):
+        self.page: Optional["uc.Tab"] = None
+        # Open a dedicated tab on first use instead of driving the main tab
+        self.needs_own_tab = own_tab
+        # Element locations from the last screenshot (IDs are stable between captures)
+        # Format: { "1": {"x": 100, "y": 200, "w": 80, "h": 30, "left": 60, "top": 185, "desc": "Submit Button", "tag": "BUTTON", ...} }
+        self.som_map: Dict[str, dict] = {}
+        # Added / changed / removed counts from the last tagging pass
+        self.som_changes: dict = {"reset": True, "added": 0, "changed": 0, "removed": 0}
+        # Heuristic classification of the last tagged page (see page_state.py)
+        self.page_state: dict = {"state": UNKNOWN, "confidence": 0.0, "reason": "no screenshot yet"}
+        # Bounds of the topmost visible dialog in the last tagged frame (used for model crops)
+        self.dialog_rect: Optional[dict] = None
+        # Perceptual hash and tagged image of the last broadcast frame (see frame_cache.py)
+        self.last_frame_hash: Optional[int] = None
+        self.last_tagged_image: Optional[Image.Image] = None
+
+
+# Tab state of the current task; tasks inherit it, so concurrent sessions never see each other's
+_tab_var: contextvars.ContextVar = contextvars.ContextVar("commuter_tab", default=TabState())
+
+
+def _tab() -> TabState:
+    return _tab_var.get()
 
-# Global map to store element locations from the last screenshot
-# Format: { "1": {"x": 100, "y": 200, "desc": "Submit Button"} }
-_som_map: Dict[str, dict] = {}
 
+def use_tab_state(state: TabState):
+    """Make `state` the tab state for the current task (and tasks it starts)."""
+    _tab_var.set(state)
 
-async def get_browser() -> uc.Browser:
+
+# Page-side lookup of the topmost visible modal, shared by the layout probe and the tagging pass
+_TOPMOST_DIALOG_JS = """
+            const dialog = Array.from(document.querySelectorAll('[role="dialog"], .artdeco-modal')).reverse().find((d) => {
+                const r = d.getBoundingClientRect();
+                return r.width > 0 && r.height > 0;
+            }) || null;
+"""
+
+
+async def get_browser() -> "uc.Browser":
     """Get or create browser instance using nodriver."""
     global _browser
-    if _browser is None or getattr(_browser, 'stopped', True):
-        # Starts native Chrome on the machine. Automatically bypasses detection.
-        # We use a custom user_data_dir to persistently store cookies/logins between runs.
-        profile_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "chrome_profile"))
-        _browser = await uc.start(user_data_dir=profile_path)
+    async with _browser_lock:
+        if _browser is None or getattr(_browser, 'stopped', True):
+            # Starts native Chrome on the machine. Automatically bypasses detection.
+            # We use a custom user_data_dir to persistently store cookies/logins between runs.
+            # Browser worker processes (see browser_broker.py) each get their own profile directory
+            profile_name = os.getenv("COMMUTER_CHROME_PROFILE", "chrome_profile")
+            profile_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", profile_name))
+            import nodriver as uc
+            
+            start = time.perf_counter()
+            _browser = await uc.start(user_data_dir=profile_path)
+            _launch_stats["cold_starts"] += 1
+            _launch_stats["last_cold_start_ms"] = round((time.perf_counter() - start) * 1000, 1)
     return _browser
 
 
-async def get_page() -> uc.Tab:
+async def get_page() -> "uc.Tab":
     """Get or create the main tab instance."""
-    global _page, _browser
+    start = time.perf_counter()
+    cold_starts = _launch_stats["cold_starts"]
     browser = await get_browser()
+    tab = _tab()
+    
+    # Check if we have an active page (a closed/crashed tab is replaced)
+    if tab.page is not None and getattr(tab.page, 'closed', False):
+        tab.page = None
+    if tab.page is None and tab.needs_own_tab:
+        # Imported here: browser_pool builds on this module
+        from .browser_pool import acquire_tab
+        tab.page = await acquire_tab()
+        tab.needs_own_tab = False
+    if tab.page is None:
+        main_tab = browser.main_tab
+        if main_tab is None or getattr(main_tab, 'closed', False):
+            # The main tab was closed: drive a warm spare instead of restarting Chrome
+            from .browser_pool import acquire_tab
+            main_tab = await acquire_tab()
+            await main_tab.bring_to_front()
+        tab.page = main_tab
     
-    # Check if we have an active page
-    if _page is None:
-        _page = browser.main_tab
-    return _page
+    if _launch_stats["cold_starts"] == cold_starts:
+        _launch_stats["warm_acquires"] += 1
+        _launch_stats["last_warm_acquire_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return tab.page
+
+
+def set_active_page(tab: "uc.Tab"):
+    """Make `tab` the page browser tools act on (for the current tab state)."""
+    _tab().page = tab
+
+
+def get_launch_stats() -> dict:
+    """Cold-start vs warm-start timings of browser acquisition."""
+    return dict(_launch_stats)
+
+
+async def reset_browser():
+    """Stop the browser (if still running) so the next get_browser() launches a fresh one."""
+    global _browser
+    async with _browser_lock:
+        if _browser and not getattr(_browser, 'stopped', True):
+            try:
+                _browser.stop()
+            except Exception as e:
+                print(f"Error stopping browser: {str(e)}")
+        _browser = None
+        # Tabs of other tab states die with the browser and are replaced on their next get_page()
+        _tab().page = None
+
+
+def get_som_map() -> Dict[str, dict]:
+    """Element map from the last tagged screenshot."""
+    return _tab().som_map
+
+
+def get_page_state() -> dict:
+    """Heuristic page state from the last tagged screenshot."""
+    return _tab().page_state
+
+
+def get_last_frame_hash() -> Optional[int]:
+    """Perceptual hash of the last tagged frame (None before the first screenshot)."""
+    return _tab().last_frame_hash
+
+
+def is_browser_running() -> bool:
+    return _browser is not None and not getattr(_browser, 'stopped', True)
+
+
+def mirror_capture(frame_hash: Optional[int], page_state: dict):
+    """Record what a capture made elsewhere (a browser worker) saw, for in-process readers like the vision cache."""
+    tab = _tab()
+    tab.last_frame_hash = frame_hash
+    tab.page_state = page_state
 
 
 def set_screenshot_callback(callback):
@@ -49,6 +188,26 @@ def set_screenshot_callback(callback):
     _screenshot_callback = callback
 
 
+def set_action_callback(callback):
+    """Register a listener called after every successful browser action (used for trace recording)."""
+    global _action_callback
+    _action_callback = callback
+
+
+async def emit_screenshot(data: str, mime: str):
+    """Forward an already encoded frame to the screenshot listener (frames from browser workers)."""
+    if _screenshot_callback:
+        await _screenshot_callback(data, mime)
+
+
+def _notify_action(action: str, element: Optional[dict] = None, text: Optional[str] = None, url: str = ""):
+    if _action_callback:
+        try:
+            _action_callback(action, element, text, url)
+        except Exception as e:
+            print(f"Action callback failed: {str(e)}")
+
+
 def set_intervention_mode(active: bool):
     global _intervention_mode
     _intervention_mode = active
@@ -58,111 +217,255 @@ def is_intervention_mode() -> bool:
     return _intervention_mode
 
 
-async def _tag_screenshot(screenshot_bytes: bytes, page: uc.Tab) -> str:
+def _to_image_coords(x: float, y: float, in_scroller: bool, layout: Optional[dict]) -> tuple:
+    """Map viewport coordinates of an element onto a (possibly full-page) capture."""
+    if not layout:
+        return x, y
+    if layout["mode"] == "window":
+        return x + layout["scroll_x"], y + layout["scroll_y"]
+    # Stitched scroll container: its content is unrolled in place, everything below it shifts down
+    if in_scroller:
+        return x, y + layout["scroll_top"]
+    if y >= layout["y"] + layout["client_height"]:
+        return x, y + layout["scroll_height"] - layout["client_height"]
+    return x, y
+
+
+async def _tag_screenshot(image: Image.Image, page: "uc.Tab", layout: Optional[dict] = None) -> Image.Image:
     """
-    Internal: Draw bounding boxes (Visual SOM) on the screenshot.
-    Populates _som_map with clickable coordinates.
+    Internal: Draw bounding boxes (Visual SOM) on the screenshot and return the tagged image.
+    Updates the tab's som_map incrementally from the page-side tracker (see som_tracker.py), and sets
+    page_state with the heuristic classification and dialog_rect with the topmost modal's bounds.
+    For full-page captures, `layout` (from _capture_full_page) maps elements to absolute positions.
     """
-    global _som_map
-    _som_map.clear()
+    tab = _tab()
     
-    # 1. Get all interactive elements via JS
+    # 1. Get changed interactive elements (and page-state signals) via JS in a single pass
     js_query = """
-        const items = [];
-        const selector = 'button, a, input, select, textarea, [role="button"]';
-        document.querySelectorAll(selector).forEach((el) => {
-            const rect = el.getBoundingClientRect();
-            if (rect.width > 0 && rect.height > 0 && window.getComputedStyle(el).visibility !== 'hidden') {
-                items.push({
-                    x: rect.x,
-                    y: rect.y,
-                    w: rect.width,
-                    h: rect.height,
-                    tag: el.tagName,
-                    text: el.innerText ? el.innerText.substring(0, 20) : el.getAttribute('aria-label') || ''
-                });
-            }
-        });
-        return items;
+        (() => {""" + _TOPMOST_DIALOG_JS + SOM_TRACKER_JS + SIGNALS_JS + """
+            const dialogRect = dialog ? dialog.getBoundingClientRect() : null;
+            return {
+                delta: delta,
+                signals: signals,
+                dialog_rect: dialogRect ? { x: dialogRect.x, y: dialogRect.y, w: dialogRect.width, h: dialogRect.height } : null
+            };
+        })()
     """
     # Evaluate executes JS directly in the tab and returns results
-    elements = await page.evaluate(js_query)
-    
-    # 2. Process Image with PIL
-    image = Image.open(io.BytesIO(screenshot_bytes))
-    draw = ImageDraw.Draw(image)
+    result = await page.evaluate(js_query)
+    tab.som_changes = apply_som_delta(tab.som_map, result["delta"])
+    elements = [{"tag": el["tag"], "text": el["desc"], "in_dialog": el["in_dialog"]} for el in tab.som_map.values()]
+    tab.page_state = classify_page_state(result["signals"], elements)
+    dialog_rect = result.get("dialog_rect")
+    if dialog_rect and layout:
+        dialog_x, dialog_y = _to_image_coords(dialog_rect["x"], dialog_rect["y"], False, layout)
+        extra = layout.get("scroll_height", 0) - layout.get("client_height", 0)
+        dialog_rect = {"x": dialog_x, "y": dialog_y, "w": dialog_rect["w"], "h": dialog_rect["h"] + extra}
+    tab.dialog_rect = dialog_rect
     
-    try:
-        font = ImageFont.load_default()
-    except:
-        font = None
-
-    # 3. Draw boxes and assign IDs
-    for idx, el in enumerate(elements):
-        tag_id = str(idx + 1)
-        x, y, w, h = el['x'], el['y'], el['w'], el['h']
-        
-        # Save to map for clicking later
-        center_x = x + w / 2
-        center_y = y + h / 2
-        _som_map[tag_id] = {"x": center_x, "y": center_y, "desc": el['text']}
-        
-        # Draw Box (Green for distinction)
-        draw.rectangle([x, y, x + w, y + h], outline="#00ff00", width=2)
-        
-        # Draw ID Label
-        draw.rectangle([x, y, x + 20, y + 15], fill="#00ff00")
-        draw.text((x + 2, y + 1), tag_id, fill="black", font=font)
+    # 2. Collect boxes; IDs are stable across captures, so unchanged elements keep their numbers
+    boxes = []
+    for tag_id, el in tab.som_map.items():
+        # Position on the captured image (differs from the viewport for full-page captures)
+        x, y = _to_image_coords(el['left'], el['top'], el['in_scroller'], layout)
+        boxes.append((x, y, el['w'], el['h'], tag_id))
 
-    # 4. Convert back to base64
-    buffered = io.BytesIO()
-    image.save(buffered, format="PNG")
-    return base64.b64encode(buffered.getvalue()).decode("utf-8")
+    # 3. Draw all boxes and ID labels (Green for distinction) in one batch
+    return render_overlay(image, boxes)
 
 
-async def take_screenshot() -> dict:
-    """Take a screenshot, apply Visual SOM tags, and stream to UI."""
-    try:
-        page = await get_page()
-        
-        # Save to temporary file since nodriver outputs screenshots to disk
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-            temp_name = f.name
-            
-        await page.save_screenshot(temp_name)
+async def _save_screenshot_image(page: "uc.Tab", full_page: bool = False) -> Image.Image:
+    # Save to temporary file since nodriver outputs screenshots to disk
+    with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
+        temp_name = f.name
         
-        with open(temp_name, "rb") as image_file:
-            png_bytes = image_file.read()
-            
-        os.remove(temp_name)
+    await page.save_screenshot(temp_name, full_page=full_page)
+    
+    with open(temp_name, "rb") as image_file:
+        png_bytes = image_file.read()
         
+    os.remove(temp_name)
+    return Image.open(io.BytesIO(png_bytes))
+
+
+async def _capture_full_page(page: "uc.Tab") -> tuple:
+    """
+    Internal: Capture the whole scrollable area in one image.
+    If an open dialog has its own scroll container, that container is scrolled and stitched;
+    otherwise the full document is captured. Returns (image, layout) for _tag_screenshot.
+    """
+    layout = await page.evaluate("""
+        (() => {""" + _TOPMOST_DIALOG_JS + """
+            document.querySelectorAll('[data-som-scroller]').forEach((el) => el.removeAttribute('data-som-scroller'));
+            if (window.__som) { window.__som.dirty = true; window.__som.full = true; }
+            const scroller = dialog ? [dialog, ...dialog.querySelectorAll('*')].find((el) => {
+                const overflow = window.getComputedStyle(el).overflowY;
+                return el.scrollHeight > el.clientHeight + 4 && (overflow === 'auto' || overflow === 'scroll');
+            }) : null;
+            if (!scroller) {
+                return { mode: 'window', scroll_x: window.scrollX, scroll_y: window.scrollY };
+            }
+            scroller.setAttribute('data-som-scroller', '1');
+            const r = scroller.getBoundingClientRect();
+            return {
+                mode: 'container', x: r.x, y: r.y + scroller.clientTop, w: r.width,
+                client_height: scroller.clientHeight, scroll_height: scroller.scrollHeight, scroll_top: scroller.scrollTop
+            };
+        })()
+    """)
+    
+    if layout["mode"] == "window":
+        return await _save_screenshot_image(page, full_page=True), layout
+    
+    base = await _save_screenshot_image(page)
+    left, top = int(layout["x"]), int(layout["y"])
+    right, view_height = int(layout["x"] + layout["w"]), int(layout["client_height"])
+    extra = int(layout["scroll_height"] - layout["client_height"])
+    
+    # Page above the container bottom stays put; everything below shifts down by the unrolled height
+    image = Image.new(base.mode, (base.width, base.height + extra), "white")
+    image.paste(base.crop((0, 0, base.width, top + view_height)), (0, 0))
+    image.paste(base.crop((0, top + view_height, base.width, base.height)), (0, top + view_height + extra))
+    
+    offset = 0
+    while True:
+        await page.evaluate(f"document.querySelector('[data-som-scroller]').scrollTop = {offset}")
+        await asyncio.sleep(0.15)
+        segment = await _save_screenshot_image(page)
+        image.paste(segment.crop((left, top, right, top + view_height)), (left, top + offset))
+        if offset >= extra:
+            break
+        offset = min(offset + view_height, extra)
+    
+    await page.evaluate(f"document.querySelector('[data-som-scroller]').scrollTop = {int(layout['scroll_top'])}")
+    return image, layout
+
+
+async def _capture(
+    dedupe: bool = False,
+    focus_ids: Optional[List[str]] = None,
+    full_page: bool = False,
+    unchanged_message: str = "No visible change since the last screenshot.",
+) -> dict:
+    """
+    Internal: Capture, tag and broadcast a screenshot.
+    With dedupe, a frame that looks identical to the previous one skips tagging and broadcast.
+    The frame hash misses small changes (a ticked checkbox or radio), so only use dedupe where
+    an unchanged frame is informative by itself, never to judge whether a click worked.
+    The dashboard gets the full PNG; the returned image is preprocessed for models (see image_prep.py).
+    """
+    page = await get_page()
+    tab = _tab()
+    
+    layout = None
+    if full_page:
+        image, layout = await _capture_full_page(page)
+    else:
+        image = await _save_screenshot_image(page)
+    current_hash = frame_hash(image)
+    
+    unchanged = dedupe and tab.last_tagged_image is not None and is_same_frame(current_hash, tab.last_frame_hash)
+    if not unchanged:
         # Apply SOM Tags
-        tagged_base64 = await _tag_screenshot(png_bytes, page)
+        tab.last_tagged_image = await _tag_screenshot(image, page, layout)
+        tab.last_frame_hash = current_hash
         
-        # Stream to Dashboard
+        # Stream to Dashboard (full resolution)
         if _screenshot_callback:
-            await _screenshot_callback(tagged_base64)
-        
-        return {
-            "status": "success",
-            "screenshot_base64": tagged_base64,
-            "interactive_elements_count": len(_som_map)
-        }
+            await _screenshot_callback(*encode_overlay(tab.last_tagged_image))
+    
+    roi = region_of_interest(
+        tab.last_tagged_image.size, tab.som_map, tab.dialog_rect, focus_ids,
+        to_image=lambda x, y, in_scroller: _to_image_coords(x, y, in_scroller, layout),
+    )
+    model_base64, model_stats = prepare_for_model(tab.last_tagged_image, roi, full_page=layout is not None)
+    
+    result = {
+        "status": "success",
+        "screenshot_base64": model_base64,
+        "screenshot_stats": model_stats,
+        "interactive_elements_count": len(tab.som_map),
+        "element_changes": tab.som_changes,
+        "page_state": tab.page_state,
+    }
+    if unchanged:
+        result["no_visible_change"] = True
+        result["message"] = unchanged_message
+    return result
+
+
+@routed
+async def take_screenshot(focus_element_ids: Optional[List[str]] = None, full_page: bool = False) -> dict:
+    """
+    Take a screenshot, apply Visual SOM tags, and stream to UI.
+    Pass focus_element_ids to get a close-up crop around those IDs; an open dialog is cropped automatically.
+    Use full_page=True to see the whole page (or a long Easy Apply form) in one image instead of scrolling;
+    off-screen IDs from it can be clicked directly.
+    """
+    try:
+        return await _capture(dedupe=True, focus_ids=focus_element_ids, full_page=full_page)
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
 
+async def _resolve_point(page: "uc.Tab", element_id: str) -> tuple:
+    """Viewport point to click for a SOM ID, scrolling it into view first if it was off-screen."""
+    coords = _tab().som_map[element_id]
+    if not coords.get("offscreen"):
+        return int(coords['x']), int(coords['y'])
+    
+    point = await page.evaluate(f"""
+        (() => {{
+            const el = document.querySelector('[data-som-id="{int(element_id)}"]');
+            if (!el) return null;
+            el.scrollIntoView({{ block: 'center', inline: 'center' }});
+            const r = el.getBoundingClientRect();
+            return {{ x: r.x + r.width / 2, y: r.y + r.height / 2 }};
+        }})()
+    """)
+    if not point:
+        raise ValueError(f"Element {element_id} is no longer on the page; take a new screenshot")
+    await asyncio.sleep(0.3)
+    return int(point['x']), int(point['y'])
+
+
+def _current_url(arguments: dict) -> str:
+    return getattr(_tab().page, "url", "") or ""
+
+
+def _is_prefetched(arguments: dict) -> bool:
+    # A page already loaded in a background tab took its pacing token when it was prefetched
+    from .prefetch import is_loaded
+    return is_loaded(arguments["url"])
+
+
+@routed
+@paced("navigate", url_of=lambda arguments: arguments["url"], skip_if=_is_prefetched)
 async def navigate_to_url(url: str) -> dict:
     """Navigate to a URL and return tagged screenshot."""
+    from .prefetch import take_prefetched
+
     try:
         page = await get_page()
-        await page.get(url)
-        await asyncio.sleep(2) # Wait for renders
-        return await take_screenshot()
+        prefetched = await take_prefetched(url)
+        if prefetched is not None:
+            # Already loaded in a background tab: switch to it instead of a cold load
+            await prefetched.bring_to_front()
+            if page is not _browser.main_tab:
+                await page.close()
+            set_active_page(prefetched)
+            await asyncio.sleep(0.3)
+        else:
+            await page.get(url)
+            await asyncio.sleep(2) # Wait for renders
+        _notify_action("navigate", url=url)
+        return await _capture()
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
 
+@routed
+@paced("click", url_of=_current_url)
 async def click_element(element_id: Optional[str] = None, selector: Optional[str] = None) -> dict:
     """
     Click an element using its Visual ID (preferred) or selector.
@@ -170,11 +473,14 @@ async def click_element(element_id: Optional[str] = None, selector: Optional[str
     try:
         page = await get_page()
         
-        if element_id and element_id in _som_map:
+        som_map = _tab().som_map
+        if element_id and element_id in som_map:
             # CLICK BY ID (Reliable layout coordinates)
-            coords = _som_map[element_id]
-            print(f"Clicking ID {element_id} at {coords['x']}, {coords['y']}")
-            await page.mouse_click(int(coords['x']), int(coords['y']))
+            coords = som_map[element_id]
+            cx, cy = await _resolve_point(page, element_id)
+            print(f"Clicking ID {element_id} at {cx}, {cy}")
+            await page.mouse_click(cx, cy)
+            _notify_action("click", element=dict(coords), url=getattr(page, "url", ""))
         elif selector:
             # Fallback Native Node Driver Selector
             el = await page.select(selector)
@@ -186,19 +492,23 @@ async def click_element(element_id: Optional[str] = None, selector: Optional[str
             return {"status": "error", "error": "Provide element_id (from screenshot) or selector"}
         
         await asyncio.sleep(1)
-        return await take_screenshot()
+        # A checkbox or radio tick is too small for the frame hash; always re-tag after a click
+        return await _capture()
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
 
+@routed
+@paced("type", url_of=_current_url)
 async def type_text(text: str, element_id: Optional[str] = None, selector: Optional[str] = None) -> dict:
     """Type text into an element."""
     try:
         page = await get_page()
         
-        if element_id and element_id in _som_map:
-            coords = _som_map[element_id]
-            cx, cy = int(coords['x']), int(coords['y'])
+        som_map = _tab().som_map
+        if element_id and element_id in som_map:
+            coords = som_map[element_id]
+            cx, cy = await _resolve_point(page, element_id)
             # Click to gain focus
             await page.mouse_click(cx, cy)
             
@@ -215,6 +525,7 @@ async def type_text(text: str, element_id: Optional[str] = None, selector: Optio
                     }}
                 }})()
             ''')
+            _notify_action("type", element=dict(coords), text=text, url=getattr(page, "url", ""))
         elif selector:
             el = await page.select(selector)
             if el:
@@ -227,11 +538,140 @@ async def type_text(text: str, element_id: Optional[str] = None, selector: Optio
             return {"status": "error", "error": "Provide element_id (from screenshot) or selector"}
             
         await asyncio.sleep(0.5)
-        return await take_screenshot()
+        return await _capture()
+    except Exception as e:
+        return {"status": "error", "error": str(e)}
+
+
+# Page-side runner for perform_actions; `ops` is injected as a JSON literal
+_BATCH_JS = """
+        (async () => {
+            const ops = %s;
+            const pause = () => new Promise((resolve) => setTimeout(resolve, 60));
+            const setValue = (el, value) => {
+                // Native setter so framework-controlled inputs (React etc.) register the change
+                const proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+                    : el instanceof HTMLSelectElement ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+                const setter = Object.getOwnPropertyDescriptor(proto, 'value');
+                if (setter && setter.set) setter.set.call(el, value); else el.value = value;
+                el.dispatchEvent(new Event('input', { bubbles: true }));
+                el.dispatchEvent(new Event('change', { bubbles: true }));
+            };
+            const TEXT_INPUTS = ['text', 'email', 'tel', 'number', 'url', 'search', 'password', 'date', 'month', 'week', 'time'];
+            const isTextField = (el) => el instanceof HTMLTextAreaElement
+                || (el instanceof HTMLInputElement && TEXT_INPUTS.includes(el.type));
+            const run = (op, el) => {
+                if (op.op === 'click') {
+                    const before = el.checked;
+                    el.click();
+                    if (el.type === 'checkbox') return { ok: el.checked !== before };
+                    if (el.type === 'radio') return { ok: el.checked };
+                    return { ok: true };
+                }
+                if (op.op === 'type') {
+                    el.focus();
+                    if (el.isContentEditable) {
+                        el.textContent = op.text;
+                        el.dispatchEvent(new Event('input', { bubbles: true }));
+                        return { ok: el.textContent === op.text };
+                    }
+                    if (!isTextField(el)) return { ok: false, detail: `not a text field (<${el.tagName.toLowerCase()}>)` };
+                    setValue(el, op.text);
+                    return { ok: el.value === op.text };
+                }
+                if (el.tagName !== 'SELECT') return { ok: false, detail: 'not a <select>' };
+                const wanted = op.text.trim().toLowerCase();
+                const option = Array.from(el.options).find((o) =>
+                    o.value.toLowerCase() === wanted || o.text.trim().toLowerCase() === wanted);
+                if (!option) return { ok: false, detail: 'no option matches' };
+                setValue(el, option.value);
+                return { ok: el.value === option.value, detail: option.text.trim() };
+            };
+            const results = [];
+            for (const op of ops) {
+                const el = document.querySelector(`[data-som-id="${op.element_id}"]`);
+                let outcome;
+                if (!el) {
+                    outcome = { ok: false, detail: 'element no longer on the page' };
+                } else {
+                    el.scrollIntoView({ block: 'center', inline: 'center' });
+                    // One failing op must not reject the whole batch and lose the report of the others
+                    try {
+                        outcome = run(op, el);
+                    } catch (e) {
+                        outcome = { ok: false, detail: String(e && e.message || e) };
+                    }
+                }
+                results.push({
+                    ok: outcome.ok,
+                    detail: outcome.detail || null,
+                    error: outcome.ok ? null : (outcome.detail || 'value did not stick')
+                });
+                if (!outcome.ok && op.stop_on_error) break;
+                await pause();
+            }
+            return results;
+        })()
+"""
+
+BATCH_OPS = ("click", "type", "select")
+
+
+@routed
+@paced("batch", url_of=_current_url)
+async def perform_actions(actions: List[dict], stop_on_error: bool = True) -> dict:
+    """
+    Run several element actions in one go and return a single screenshot at the end.
+    Use it to fill a form: each action is {"op": "click" | "type" | "select", "element_id": "12", "text": "..."}
+    ("text" is the value to type, or the option to pick for select). Actions run in order and each is verified;
+    by default the batch stops at the first failed action.
+    """
+    try:
+        page = await get_page()
+        som_map = _tab().som_map
+        ops = []
+        for index, action in enumerate(actions):
+            op, element_id = action.get("op"), str(action.get("element_id", ""))
+            if op not in BATCH_OPS:
+                return {"status": "error", "error": f"Action {index + 1}: op must be one of {', '.join(BATCH_OPS)}"}
+            if element_id not in som_map:
+                return {"status": "error", "error": f"Action {index + 1}: unknown element_id {element_id!r}; take a new screenshot"}
+            ops.append({"op": op, "element_id": int(element_id), "text": str(action.get("text", "")), "stop_on_error": stop_on_error})
+
+        interrupted = None
+        try:
+            results = await page.evaluate(_BATCH_JS % json.dumps(ops), await_promise=True)
+        except Exception as e:
+            # E.g. a click navigated away mid-batch: some actions may have run, so still report the page
+            results, interrupted = [], str(e)
+
+        report = []
+        for op, outcome in zip(ops, results):
+            report.append({"op": op["op"], "element_id": str(op["element_id"]), "ok": outcome["ok"],
+                           **({"error": outcome["error"]} if not outcome["ok"] else {}),
+                           **({"selected": outcome["detail"]} if op["op"] == "select" and outcome["ok"] else {})})
+            if outcome["ok"]:
+                element = dict(som_map[str(op["element_id"])])
+                _notify_action(op["op"], element=element, text=op["text"] if op["op"] != "click" else None,
+                               url=getattr(page, "url", ""))
+
+        await asyncio.sleep(0.5)
+        capture = await _capture()
+        failed = [item for item in report if not item["ok"]]
+        result = {
+            **capture,
+            "status": "success" if not failed and len(report) == len(ops) else "partial",
+            "actions": report,
+            "completed_actions": sum(item["ok"] for item in report),
+        }
+        if interrupted:
+            result["error"] = f"Batch interrupted ({interrupted}); check the screenshot before retrying any action"
+        return result
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
 
+@routed
 async def scroll_page(direction: str = "down") -> dict:
     """Scroll and update screenshot."""
     try:
@@ -241,7 +681,10 @@ async def scroll_page(direction: str = "down") -> dict:
         else:
             await page.scroll_up(500)
         await asyncio.sleep(0.5)
-        return await take_screenshot()
+        return await _capture(
+            dedupe=True,
+            unchanged_message=f"The page did not move; you are already at the {'bottom' if direction == 'down' else 'top'}.",
+        )
     except Exception as e:
         return {"status": "error", "error": str(e)}
 
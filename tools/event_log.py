@@ -0,0 +1,202 @@
+"""
+Session Event Log
+Append-only, gzip-compressed JSON Lines log per session for offline performance analysis.
+Every record has the same flat columns (unused ones are null), so a directory of logs loads
+straight into pandas / DuckDB / Parquet. Records are buffered in memory and written as
+extra gzip members, which keeps the files append-only and readable with plain gzip.
+
+Off by default, since the app must run without local file writes: enable it with
+COMMUTER_EVENT_LOG=1. Logs go to a temp directory unless COMMUTER_EVENT_LOG_DIR points at
+a mounted volume or a shipping agent's spool; files older than the retention are deleted.
+
+Usage:
+    python -m tools.event_log [LOG_DIR_OR_FILES ...] [--session ID] [--top 10]
+"""
+
+import argparse
+import asyncio
+import glob
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+EVENT_LOG_ENABLED = os.getenv("COMMUTER_EVENT_LOG", "0") == "1"
+EVENT_LOG_DIR = os.getenv("COMMUTER_EVENT_LOG_DIR", os.path.join(tempfile.gettempdir(), "commuter-events"))
+
+# Session logs not written to for this many hours are deleted (checked once per process)
+RETENTION_HOURS = float(os.getenv("COMMUTER_EVENT_LOG_RETENTION_HOURS", "72"))
+
+# Buffered records per session before they are compressed and appended
+FLUSH_EVERY = 50
+
+COLUMNS = (
+    "ts",                 # unix time (s)
+    "session",
+    "application",        # job URL the session was working on (set by navigate_to_url)
+    "kind",               # event | transfer | llm | tool | prompt (instruction size before a model call)
+    "agent",
+    "name",               # tool name or transfer target
+    "duration_ms",
+    "status",
+    "model",              # model requested by the agent
+    "served_model",       # model that actually answered
+    "fallback_hops",      # 0 = primary answered, n = n-th fallback
+    "prompt_tokens",      # llm: provider-reported; prompt: system instruction only
+    "completion_tokens",
+    "frame_hash",         # perceptual hash (hex) of the screenshot a tool produced
+)
+
+_buffers: Dict[str, List[str]] = defaultdict(list)
+_applications: Dict[str, Optional[str]] = {}
+
+# One writer at a time per file: concurrent appends would interleave gzip members
+_write_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+_write_locks_guard = threading.Lock()
+_pruned = False
+
+
+def _path(session: str) -> str:
+    return os.path.join(EVENT_LOG_DIR, f"{session}.jsonl.gz")
+
+
+def set_application(session: str, application: Optional[str]):
+    """Tag the session's following records with the application (job URL) being worked on."""
+    _applications[session] = application
+
+
+def log_event(session: str, kind: str, **fields):
+    """Buffer one record; unknown field names are a programming error."""
+    if not EVENT_LOG_ENABLED:
+        return
+    unknown = set(fields) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown event log columns: {sorted(unknown)}")
+
+    record = dict.fromkeys(COLUMNS)
+    record.update(ts=round(time.time(), 3), session=session, application=_applications.get(session), kind=kind)
+    record.update(fields)
+    _buffers[session].append(json.dumps(record, separators=(",", ":")))
+
+    if len(_buffers[session]) >= FLUSH_EVERY:
+        lines = _buffers.pop(session)
+        try:
+            # Compression and disk I/O stay off the event loop
+            asyncio.get_running_loop().run_in_executor(None, _append, session, lines)
+        except RuntimeError:
+            _append(session, lines)
+
+
+def _prune():
+    cutoff = time.time() - RETENTION_HOURS * 3600
+    for path in glob.glob(os.path.join(EVENT_LOG_DIR, "*.jsonl.gz")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def _append(session: str, lines: List[str]):
+    global _pruned
+    with _write_locks_guard:
+        lock = _write_locks[session]
+        prune, _pruned = not _pruned, True
+    try:
+        os.makedirs(EVENT_LOG_DIR, exist_ok=True)
+        if prune:
+            _prune()
+        with lock, gzip.open(_path(session), "at", encoding="utf-8") as log:
+            log.write("\n".join(lines) + "\n")
+    except OSError as e:
+        print(f"Event log write failed: {str(e)}")
+
+
+def flush(session: Optional[str] = None):
+    """Write buffered records (of one session, or all)."""
+    for name in [session] if session else list(_buffers):
+        lines = _buffers.pop(name, None)
+        if lines:
+            _append(name, lines)
+
+
+async def flush_async(session: Optional[str] = None):
+    await asyncio.to_thread(flush, session)
+
+
+def read_events(paths: Iterable[str]) -> Iterable[dict]:
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as log:
+            for line in log:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def summarize(events: Iterable[dict]) -> List[dict]:
+    """Per (session, application): wall time, time in tools and LLM calls, tokens and fallback hops."""
+    groups: Dict[tuple, dict] = {}
+    for event in events:
+        key = (event["session"], event["application"])
+        group = groups.setdefault(key, {
+            "session": key[0], "application": key[1], "start": event["ts"], "end": event["ts"],
+            "llm_calls": 0, "llm_ms": 0.0, "tool_calls": 0, "tool_ms": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0, "fallback_hops": 0, "errors": 0,
+            "tools": defaultdict(float), "models": defaultdict(int),
+        })
+        group["start"] = min(group["start"], event["ts"])
+        group["end"] = max(group["end"], event["ts"])
+        duration = event["duration_ms"] or 0.0
+
+        if event["kind"] == "llm":
+            group["llm_calls"] += 1
+            group["llm_ms"] += duration
+            group["prompt_tokens"] += event["prompt_tokens"] or 0
+            group["completion_tokens"] += event["completion_tokens"] or 0
+            group["fallback_hops"] += event["fallback_hops"] or 0
+            group["models"][event["served_model"] or event["model"]] += 1
+        elif event["kind"] == "tool":
+            group["tool_calls"] += 1
+            group["tool_ms"] += duration
+            group["tools"][event["name"]] += duration
+        if event["status"] == "error":
+            group["errors"] += 1
+
+    return sorted(groups.values(), key=lambda group: group["start"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize where time and tokens went per application")
+    parser.add_argument("paths", nargs="*", default=[EVENT_LOG_DIR], help="Log files or directories")
+    parser.add_argument("--session", help="Only this session")
+    parser.add_argument("--top", type=int, default=3, help="Slowest tools listed per application")
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        files += sorted(glob.glob(os.path.join(path, "*.jsonl.gz"))) if os.path.isdir(path) else [path]
+    if args.session:
+        files = [path for path in files if os.path.basename(path) == f"{args.session}.jsonl.gz"]
+    if not files:
+        raise SystemExit(f"No event logs found in {', '.join(args.paths)}")
+
+    print(f"{'session':<10} {'wall s':>7} {'llm s':>7} {'tools s':>8} {'calls':>6} {'tokens in/out':>15} {'hops':>5}  application")
+    for group in summarize(read_events(files)):
+        tokens = f"{group['prompt_tokens']}/{group['completion_tokens']}"
+        print(
+            f"{group['session']:<10} {group['end'] - group['start']:>7.1f} {group['llm_ms'] / 1000:>7.1f} "
+            f"{group['tool_ms'] / 1000:>8.1f} {group['llm_calls'] + group['tool_calls']:>6} {tokens:>15} "
+            f"{group['fallback_hops']:>5}  {group['application'] or '(no application)'}"
+        )
+        slowest = sorted(group["tools"].items(), key=lambda item: -item[1])[:args.top]
+        if slowest:
+            print(" " * 11 + "slowest tools: " + ", ".join(f"{name} {ms / 1000:.1f}s" for name, ms in slowest))
+        if group["models"]:
+            print(" " * 11 + "models: " + ", ".join(f"{name} x{count}" for name, count in group["models"].items()))
+
+
+if __name__ == "__main__":
+    main()
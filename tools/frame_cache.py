@@ -0,0 +1,91 @@
+"""
+Frame Hashing & Vision Result Cache
+Perceptual hashes of raw captures and an LRU of earlier vision answers
+"""
+
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from PIL import Image
+
+# Grid size of each hash component (HASH_SIZE * HASH_SIZE bits).
+# 16 separates layout changes (a new dialog, a scrolled page, an error banner), but small controls
+# such as a ticked checkbox or radio usually hash identically: never treat "same frame" as "action failed".
+HASH_SIZE = 16
+
+# Frames whose hashes differ by at most this many bits are treated as identical
+# (absorbs caret blinks and sub-pixel rendering noise)
+FRAME_HASH_THRESHOLD = 1
+
+
+def frame_hash(image: Image.Image) -> int:
+    """
+    Perceptual hash of a raw capture: a difference hash (edges / layout) followed by
+    an average hash (large flat regions, which dHash alone cannot see change colour).
+    """
+    gray = image.convert("L")
+
+    diff_pixels = gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR).tobytes()
+    value = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            value = (value << 1) | (diff_pixels[offset + col] > diff_pixels[offset + col + 1])
+
+    mean_pixels = gray.resize((HASH_SIZE, HASH_SIZE), Image.Resampling.BOX).tobytes()
+    mean = sum(mean_pixels) / len(mean_pixels)
+    for pixel in mean_pixels:
+        value = (value << 1) | (pixel > mean)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def is_same_frame(a: Optional[int], b: Optional[int]) -> bool:
+    return a is not None and b is not None and hamming(a, b) <= FRAME_HASH_THRESHOLD
+
+
+class VisionCache:
+    """LRU of vision answers keyed by (frame hash, question); near-identical frames also hit."""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[int, str], str]" = OrderedDict()
+
+    def get(self, frame: Optional[int], question: str) -> Optional[str]:
+        if frame is None:
+            return None
+
+        key = (frame, question)
+        if key not in self._entries:
+            key = next((k for k in self._entries if k[1] == question and is_same_frame(k[0], frame)), None)
+
+        if key is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def peek(self, frame: Optional[int], question: str) -> Optional[str]:
+        """Exact-key lookup that leaves the LRU order and hit counters untouched."""
+        return self._entries.get((frame, question))
+
+    def put(self, frame: Optional[int], question: str, answer: str):
+        if frame is None or not answer:
+            return
+        self._entries[(frame, question)] = answer
+        self._entries.move_to_end((frame, question))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+vision_cache = VisionCache()
@@ -0,0 +1,110 @@
+"""
+Vision Input Preprocessing
+Downscales, crops and re-encodes tagged screenshots before they reach a model.
+The dashboard keeps receiving the full-resolution PNG.
+"""
+
+import base64
+import io
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+# Longest side (px) of the image handed to models; 0 disables downscaling.
+# Full-page captures are limited by width only, so ID labels on long pages stay legible.
+VISION_MAX_SIDE = int(os.getenv("COMMUTER_VISION_MAX_SIDE", "1280"))
+
+# Encoding of model images: JPEG, WEBP or PNG
+VISION_FORMAT = os.getenv("COMMUTER_VISION_FORMAT", "JPEG").upper()
+
+# Lossy quality for JPEG/WEBP
+VISION_QUALITY = int(os.getenv("COMMUTER_VISION_QUALITY", "70"))
+
+# Crop to the topmost dialog when no element IDs are requested
+VISION_CROP = os.getenv("COMMUTER_VISION_CROP", "1") == "1"
+
+# Context kept around the region of interest (px)
+CROP_PADDING = 40
+
+Box = Tuple[int, int, int, int]
+
+
+def region_of_interest(
+    image_size: Tuple[int, int],
+    som_map: Dict[str, dict],
+    dialog_rect: Optional[dict] = None,
+    focus_ids: Optional[List[str]] = None,
+    to_image: Optional[Callable[[float, float, bool], Tuple[float, float]]] = None,
+) -> Optional[Box]:
+    """
+    Pick the crop box for a model image.
+    Requested element IDs win over the topmost dialog; returns None for the full frame.
+    `to_image` maps an element's viewport position onto the capture (full-page captures);
+    `dialog_rect` must already be in image coordinates.
+    """
+    boxes = []
+    for element_id in focus_ids or []:
+        el = som_map.get(str(element_id))
+        if el:
+            w, h = el.get("w", 0), el.get("h", 0)
+            left, top = el["x"] - w / 2, el["y"] - h / 2
+            if to_image:
+                left, top = to_image(left, top, el.get("in_scroller", False))
+            boxes.append((left, top, left + w, top + h))
+
+    if not boxes and VISION_CROP and dialog_rect:
+        boxes.append((
+            dialog_rect["x"], dialog_rect["y"],
+            dialog_rect["x"] + dialog_rect["w"], dialog_rect["y"] + dialog_rect["h"],
+        ))
+
+    if not boxes:
+        return None
+
+    width, height = image_size
+    left = max(0, int(min(b[0] for b in boxes)) - CROP_PADDING)
+    top = max(0, int(min(b[1] for b in boxes)) - CROP_PADDING)
+    right = min(width, int(max(b[2] for b in boxes)) + CROP_PADDING)
+    bottom = min(height, int(max(b[3] for b in boxes)) + CROP_PADDING)
+
+    if right - left <= 0 or bottom - top <= 0:
+        return None
+    return (left, top, right, bottom)
+
+
+def prepare_for_model(image: Image.Image, roi: Optional[Box] = None, full_page: bool = False) -> Tuple[str, dict]:
+    """
+    Crop, downscale and encode a tagged screenshot for a model.
+    Full-page captures are scaled to VISION_MAX_SIDE wide, whatever their height.
+
+    Returns:
+        (base64 image, stats dict with bytes, size, format and prep_ms)
+    """
+    start = time.perf_counter()
+
+    prepared = image.crop(roi) if roi else image
+    if full_page:
+        if VISION_MAX_SIDE and prepared.width > VISION_MAX_SIDE:
+            height = round(prepared.height * VISION_MAX_SIDE / prepared.width)
+            prepared = prepared.resize((VISION_MAX_SIDE, height), Image.Resampling.LANCZOS)
+    elif VISION_MAX_SIDE and max(prepared.size) > VISION_MAX_SIDE:
+        prepared = prepared.copy()
+        prepared.thumbnail((VISION_MAX_SIDE, VISION_MAX_SIDE), Image.Resampling.LANCZOS)
+
+    buffered = io.BytesIO()
+    if VISION_FORMAT in ("JPEG", "WEBP"):
+        prepared.convert("RGB").save(buffered, format=VISION_FORMAT, quality=VISION_QUALITY)
+    else:
+        prepared.save(buffered, format="PNG")
+    data = buffered.getvalue()
+
+    stats = {
+        "bytes": len(data),
+        "size": list(prepared.size),
+        "format": VISION_FORMAT if VISION_FORMAT in ("JPEG", "WEBP") else "PNG",
+        "cropped": roi is not None,
+        "prep_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    return base64.b64encode(data).decode("utf-8"), stats
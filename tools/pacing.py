@@ -0,0 +1,240 @@
+"""
+Navigation Pacing
+Every navigation, click and keystroke batch waits for a token from two buckets: one per
+site (domain) and one per logged-in Chrome profile. Grants are spaced with random jitter,
+interactive dashboard actions jump ahead of queued agent work, and rates back off when a
+challenge page (CAPTCHA / security check) shows up and recover on clean pages.
+
+Buckets live in the process that drives Chrome. With browser workers (see browser_broker.py)
+each worker owns one profile, and the per-domain rate is split evenly between workers.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import itertools
+import os
+import random
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from .browser_broker import BROWSER_WORKERS
+from .page_state import INTERVENTION_REQUIRED
+
+PACING_ENABLED = os.getenv("COMMUTER_PACING", "1") == "1"
+
+# Sustained actions per second and burst size, per site and per Chrome profile
+DOMAIN_RATE = float(os.getenv("COMMUTER_PACE_DOMAIN_RATE", "0.5"))
+DOMAIN_BURST = float(os.getenv("COMMUTER_PACE_DOMAIN_BURST", "4"))
+PROFILE_RATE = float(os.getenv("COMMUTER_PACE_PROFILE_RATE", "0.4"))
+PROFILE_BURST = float(os.getenv("COMMUTER_PACE_PROFILE_BURST", "6"))
+
+# Extra random delay (seconds) added to every grant so actions never land on a fixed cadence
+JITTER = float(os.getenv("COMMUTER_PACE_JITTER", "0.4"))
+
+# Tokens per action: page loads are what sites rate-limit, so they cost the most
+ACTION_COST = {"navigate": 1.0, "click": 0.5, "type": 0.5, "batch": 1.0}
+
+# Rates are divided by the backoff factor; it doubles on a challenge page and decays on clean ones
+MAX_BACKOFF = 8.0
+BACKOFF_DECAY = 0.85
+
+INTERACTIVE = 0
+BATCH = 1
+
+_priority_var: contextvars.ContextVar = contextvars.ContextVar("commuter_pace_priority", default=BATCH)
+
+
+def set_priority(priority: int):
+    """Priority of browser actions issued from the current task (INTERACTIVE for dashboard actions)."""
+    _priority_var.set(priority)
+
+
+def get_priority() -> int:
+    return _priority_var.get()
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.backoff = 1.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate / self.backoff)
+        self.updated = now
+
+    def wait_time(self, cost: float, now: float) -> float:
+        """Seconds until `cost` tokens are available (0 if they are now)."""
+        self._refill(now)
+        missing = cost - self.tokens
+        return 0.0 if missing <= 0 else missing * self.backoff / self.rate
+
+    def take(self, cost: float, now: float):
+        self._refill(now)
+        self.tokens -= cost
+
+    def penalize(self):
+        self.backoff = min(MAX_BACKOFF, self.backoff * 2)
+        # Drop the saved-up burst so the slowdown takes effect immediately
+        self.tokens = min(self.tokens, 0.0)
+
+    def relax(self):
+        self.backoff = max(1.0, self.backoff * BACKOFF_DECAY)
+
+
+class NavigationScheduler:
+    """Grants actions in (priority, arrival) order as soon as both of their buckets allow it."""
+
+    def __init__(self):
+        self._domains: Dict[str, TokenBucket] = {}
+        self._profiles: Dict[str, TokenBucket] = {}
+        self._queue: list = []
+        self._arrivals = itertools.count()
+        self._changed: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._waits = {INTERACTIVE: deque(maxlen=200), BATCH: deque(maxlen=200)}
+        self._stats = {"granted": 0, "challenges": 0, "max_queue_depth": 0}
+
+    def _buckets(self, domain: str, profile: str) -> tuple:
+        if domain not in self._domains:
+            self._domains[domain] = TokenBucket(DOMAIN_RATE / max(1, BROWSER_WORKERS), DOMAIN_BURST)
+        if profile not in self._profiles:
+            self._profiles[profile] = TokenBucket(PROFILE_RATE, PROFILE_BURST)
+        return self._domains[domain], self._profiles[profile]
+
+    async def acquire(self, domain: str, profile: str, cost: float, priority: int = BATCH) -> float:
+        """Wait for this action's turn; returns the time waited in ms."""
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((priority, next(self._arrivals), domain, profile, cost, future))
+        self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._queue))
+
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        self._changed.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        start = time.perf_counter()
+        await future
+        waited = (time.perf_counter() - start) * 1000
+        self._waits[priority].append(waited)
+        return waited
+
+    async def _dispatch(self):
+        while self._queue:
+            self._changed.clear()
+            now = time.monotonic()
+            earliest = None
+            for entry in sorted(self._queue):
+                _priority, _arrival, domain, profile, cost, future = entry
+                if future.done():  # caller was cancelled
+                    self._queue.remove(entry)
+                    break
+                domain_bucket, profile_bucket = self._buckets(domain, profile)
+                wait = max(domain_bucket.wait_time(cost, now), profile_bucket.wait_time(cost, now))
+                if wait == 0:
+                    domain_bucket.take(cost, now)
+                    profile_bucket.take(cost, now)
+                    self._queue.remove(entry)
+                    self._stats["granted"] += 1
+                    # Jittered spacing before the next grant
+                    await asyncio.sleep(random.uniform(0, JITTER))
+                    if not future.done():
+                        future.set_result(None)
+                    break
+                earliest = wait if earliest is None else min(earliest, wait)
+            else:
+                if earliest is not None:
+                    # Sleep until a bucket refills, or until a new (maybe higher-priority) action arrives
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), earliest)
+                    except asyncio.TimeoutError:
+                        pass
+
+    def observe(self, domain: str, profile: str, page_state: Optional[dict]):
+        """Adapt rates to what the action led to: back off on challenge pages, recover on clean ones."""
+        domain_bucket, profile_bucket = self._buckets(domain, profile)
+        if page_state and page_state.get("state") == INTERVENTION_REQUIRED:
+            self._stats["challenges"] += 1
+            domain_bucket.penalize()
+            profile_bucket.penalize()
+        else:
+            domain_bucket.relax()
+            profile_bucket.relax()
+
+    def stats(self) -> dict:
+        def percentile(values, q):
+            ordered = sorted(values)
+            return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 1) if ordered else None
+
+        return {
+            **self._stats,
+            "enabled": PACING_ENABLED,
+            "queue_depth": len(self._queue),
+            "wait_ms": {
+                name: {"p50": percentile(self._waits[priority], 0.5), "p95": percentile(self._waits[priority], 0.95)}
+                for name, priority in (("interactive", INTERACTIVE), ("batch", BATCH))
+            },
+            "backoff": {
+                **{f"domain:{name}": round(bucket.backoff, 2) for name, bucket in self._domains.items()},
+                **{f"profile:{name}": round(bucket.backoff, 2) for name, bucket in self._profiles.items()},
+            },
+        }
+
+
+scheduler = NavigationScheduler()
+
+
+def _domain(url: str) -> str:
+    host = urlparse(url).hostname or "unknown"
+    # www.linkedin.com and linkedin.com share limits
+    return ".".join(host.split(".")[-2:])
+
+
+def _profile() -> str:
+    return os.getenv("COMMUTER_CHROME_PROFILE", "chrome_profile")
+
+
+async def wait_turn(action: str, url: str, priority: Optional[int] = None) -> tuple:
+    """Wait for a pacing token for `action` on `url`'s site; returns (domain, profile) for observe()."""
+    domain, profile = _domain(url), _profile()
+    if PACING_ENABLED:
+        await scheduler.acquire(domain, profile, ACTION_COST[action], get_priority() if priority is None else priority)
+    return domain, profile
+
+
+def paced(action: str, url_of: Callable[[dict], str], skip_if: Optional[Callable[[dict], bool]] = None):
+    """
+    Decorator for browser actions: waits for a pacing token before running and feeds the
+    resulting page_state back into the scheduler. `url_of(arguments)` names the site acted on;
+    `skip_if(arguments)` marks calls that cause no request to the site (no token is taken).
+    """
+    def decorate(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if not PACING_ENABLED:
+                return await fn(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            if skip_if is not None and skip_if(bound.arguments):
+                domain, profile = _domain(url_of(bound.arguments)), _profile()
+            else:
+                domain, profile = await wait_turn(action, url_of(bound.arguments))
+            result = await fn(*args, **kwargs)
+            if isinstance(result, dict) and "page_state" in result:
+                scheduler.observe(domain, profile, result["page_state"])
+            return result
+        return wrapper
+    return decorate
+
+
+async def pacing_status() -> dict:
+    return scheduler.stats()
@@ -0,0 +1,91 @@
+"""
+Heuristic Page-State Classifier
+Fast DOM/URL rules that run before (and usually instead of) the Vision Agent
+"""
+
+from typing import List, Optional
+
+LOGIN_DETECTED = "LOGIN_DETECTED"
+INTERVENTION_REQUIRED = "INTERVENTION_REQUIRED"
+EASY_APPLY_MODAL = "EASY_APPLY_MODAL"
+SUCCESS = "SUCCESS"
+UNKNOWN = "UNKNOWN"
+
+# Page-side signal collection. Runs inside the SOM tagging script (see browser_tools._tag_screenshot)
+# and expects `dialog` to hold the topmost visible modal (or null).
+SIGNALS_JS = """
+        const signals = {
+            url: location.href,
+            title: document.title,
+            password_fields: document.querySelectorAll('input[type="password"]').length,
+            captcha_frames: document.querySelectorAll(
+                'iframe[src*="captcha"], iframe[src*="recaptcha"], iframe[src*="hcaptcha"], iframe[src*="arkoselabs"], iframe[title*="challenge" i]'
+            ).length,
+            dialog_text: dialog ? (dialog.innerText || '').substring(0, 500) : '',
+            headings: Array.from(document.querySelectorAll('h1, h2, h3')).slice(0, 10).map((h) => (h.innerText || '').substring(0, 80)),
+        };
+"""
+
+LOGIN_URL_MARKERS = ("/login", "/uas/login", "/signup", "/authwall", "/checkpoint/lg")
+CHALLENGE_URL_MARKERS = ("/checkpoint/challenge", "captcha", "/challenge/")
+CHALLENGE_TEXT = ("i'm not a robot", "i am not a robot", "security verification", "quick security check", "verify you are human")
+SUCCESS_TEXT = ("application sent", "your application was sent", "application submitted", "your application has been submitted")
+MODAL_BUTTONS = ("next", "review", "submit application", "continue to next step", "review your application")
+MODAL_TEXT = ("apply to", "easy apply", "contact info")
+LOGIN_BUTTONS = ("sign in", "join now", "log in")
+
+
+def _lower(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def _contains_any(text: str, needles) -> bool:
+    return any(needle in text for needle in needles)
+
+
+def classify_page_state(signals: dict, elements: Optional[List[dict]] = None) -> dict:
+    """
+    Classify the page from DOM/URL signals collected alongside SOM tagging.
+
+    Args:
+        signals: Output of SIGNALS_JS (url, title, password_fields, captcha_frames, dialog_text, headings)
+        elements: SOM elements (tag, text, in_dialog) from the same evaluation pass
+
+    Returns:
+        dict with "state" (one of the module constants), "confidence" (0-1) and "reason"
+    """
+    elements = elements or []
+    url = _lower(signals.get("url"))
+    dialog_text = _lower(signals.get("dialog_text"))
+    page_text = " ".join([_lower(signals.get("title"))] + [_lower(h) for h in signals.get("headings", [])])
+    labels = [_lower(el.get("text")) for el in elements]
+    dialog_labels = [_lower(el.get("text")) for el in elements if el.get("in_dialog")]
+
+    # Ordered by priority: a CAPTCHA inside a modal is still a CAPTCHA
+    if signals.get("captcha_frames", 0) > 0 or _contains_any(url, CHALLENGE_URL_MARKERS):
+        return {"state": INTERVENTION_REQUIRED, "confidence": 0.95, "reason": "challenge frame or URL"}
+    if _contains_any(dialog_text + " " + page_text, CHALLENGE_TEXT):
+        return {"state": INTERVENTION_REQUIRED, "confidence": 0.8, "reason": "challenge text"}
+
+    if _contains_any(dialog_text, SUCCESS_TEXT):
+        return {"state": SUCCESS, "confidence": 0.95, "reason": "confirmation dialog"}
+    if _contains_any(page_text, SUCCESS_TEXT):
+        return {"state": SUCCESS, "confidence": 0.8, "reason": "confirmation heading"}
+
+    if dialog_text:
+        has_modal_buttons = any(label in MODAL_BUTTONS for label in dialog_labels)
+        has_modal_text = _contains_any(dialog_text, MODAL_TEXT)
+        if has_modal_buttons and has_modal_text:
+            return {"state": EASY_APPLY_MODAL, "confidence": 0.95, "reason": "apply dialog with step buttons"}
+        if has_modal_buttons or has_modal_text:
+            return {"state": EASY_APPLY_MODAL, "confidence": 0.7, "reason": "partial apply dialog"}
+
+    if _contains_any(url, LOGIN_URL_MARKERS):
+        return {"state": LOGIN_DETECTED, "confidence": 0.9, "reason": "login URL"}
+    has_login_button = any(label in LOGIN_BUTTONS for label in labels)
+    if signals.get("password_fields", 0) > 0 and has_login_button:
+        return {"state": LOGIN_DETECTED, "confidence": 0.85, "reason": "password field with sign-in button"}
+    if has_login_button and not _contains_any(" ".join(labels), ("easy apply", "messaging", "my network")):
+        return {"state": LOGIN_DETECTED, "confidence": 0.6, "reason": "sign-in button on logged-out page"}
+
+    return {"state": UNKNOWN, "confidence": 0.0, "reason": "no rule matched"}
@@ -0,0 +1,129 @@
+"""
+Job Page Prefetch
+Loads the next queued job URLs in background tabs while the current application runs,
+so navigate_to_url can switch to an already rendered page instead of a cold load.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from .browser_broker import get_current_session, routed
+from .browser_pool import acquire_tab
+from .pacing import BATCH, wait_turn
+
+if TYPE_CHECKING:
+    import nodriver as uc
+
+# Maximum number of job pages each session keeps loaded in background tabs (0 disables prefetching)
+PREFETCH_PAGES = int(os.getenv("COMMUTER_PREFETCH_PAGES", "1"))
+
+# Prefetched tabs per session, by URL, oldest first: (tab, load task, start time)
+# (a browser worker serves several sessions, which must not discard each other's tabs)
+_prefetched: "Dict[str, OrderedDict[str, Tuple[uc.Tab, asyncio.Task, float]]]" = {}
+_stats = {"started": 0, "hits": 0, "misses": 0, "discarded": 0, "saved_ms": 0.0}
+
+
+def _normalize(url: str) -> str:
+    # LinkedIn job links carry tracking parameters that differ between search results and clicks
+    return url.split("?", 1)[0].split("#", 1)[0].rstrip("/")
+
+
+def next_job_urls(discovered_jobs: list, current_url: str, limit: int = PREFETCH_PAGES) -> List[str]:
+    """The `limit` queued job URLs that follow `current_url` in discovered_jobs."""
+    urls = [job["url"] if isinstance(job, dict) else job for job in discovered_jobs]
+    normalized = [_normalize(url) for url in urls]
+    current = _normalize(current_url)
+    start = normalized.index(current) + 1 if current in normalized else 0
+    return [url for url in urls[start:] if _normalize(url) != current][:limit]
+
+
+async def _close(tab: "uc.Tab"):
+    try:
+        await tab.close()
+    except Exception:
+        pass
+
+
+def _session_tabs() -> "OrderedDict[str, Tuple[uc.Tab, asyncio.Task, float]]":
+    return _prefetched.setdefault(get_current_session(), OrderedDict())
+
+
+async def _discard(tabs: OrderedDict, key: str):
+    tab, task, _ = tabs.pop(key)
+    task.cancel()
+    _stats["discarded"] += 1
+    await _close(tab)
+
+
+async def _load(tab: "uc.Tab", url: str) -> float:
+    # Background loads are page loads like any other, but never jump ahead of the user
+    await wait_turn("navigate", url, priority=BATCH)
+    await tab.get(url)
+    return time.perf_counter()
+
+
+@routed
+async def prefetch_urls(urls: List[str]) -> dict:
+    """
+    Start loading `urls` in background tabs, dropping pages this session prefetched that are
+    no longer queued.
+    """
+    tabs = _session_tabs()
+    wanted = [_normalize(url) for url in urls[:PREFETCH_PAGES]]
+    for key in [key for key in tabs if key not in wanted]:
+        await _discard(tabs, key)
+
+    for url, key in zip(urls, wanted):
+        if key in tabs:
+            continue
+        try:
+            tab = await acquire_tab()
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+        tabs[key] = (tab, asyncio.create_task(_load(tab, url)), time.perf_counter())
+        _stats["started"] += 1
+
+    return {"status": "success", "prefetched": list(tabs)}
+
+
+def is_loaded(url: str) -> bool:
+    """True when this session has `url` fully loaded in a background tab (no page load left to pace)."""
+    entry = _prefetched.get(get_current_session(), {}).get(_normalize(url))
+    if entry is None:
+        return False
+    tab, task, _ = entry
+    return task.done() and not task.cancelled() and task.exception() is None and not getattr(tab, "closed", False)
+
+
+async def take_prefetched(url: str) -> Optional["uc.Tab"]:
+    """Hand over this session's background tab for `url` (waiting for its load to finish), or None on a miss."""
+    tabs = _prefetched.get(get_current_session(), {})
+    entry = tabs.pop(_normalize(url), None)
+    if entry is None:
+        if tabs:
+            _stats["misses"] += 1
+        return None
+
+    tab, task, started = entry
+    waited = time.perf_counter()
+    try:
+        loaded = await task
+    except Exception:
+        await _close(tab)
+        _stats["misses"] += 1
+        return None
+    if getattr(tab, "closed", False):
+        _stats["misses"] += 1
+        return None
+
+    _stats["hits"] += 1
+    # Page-load time the caller did not have to wait for
+    _stats["saved_ms"] += round((min(loaded, waited) - started) * 1000, 1)
+    return tab
+
+
+def get_prefetch_stats() -> dict:
+    return {**_stats, "limit": PREFETCH_PAGES, "loaded": {session: list(tabs) for session, tabs in _prefetched.items() if tabs}}
@@ -0,0 +1,75 @@
+"""
+Visual SOM Overlay Renderer
+Draws element boxes and ID labels onto screenshots with cached label sprites.
+"""
+
+import base64
+import io
+import os
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+BOX_COLOR = (0, 255, 0)
+LABEL_TEXT_COLOR = (0, 0, 0)
+OUTLINE_WIDTH = 2
+LABEL_MIN_WIDTH = 20
+LABEL_HEIGHT = 15
+
+# Dashboard encoding: "png" (lossless) or "jpeg" (lossy, much smaller and faster)
+SOM_OUTPUT_FORMAT = os.getenv("COMMUTER_SOM_OUTPUT", "png").lower()
+
+# zlib level for PNG output; 1 is several times faster than PIL's default (6) for ~10-20% more bytes
+SOM_PNG_COMPRESS_LEVEL = int(os.getenv("COMMUTER_SOM_PNG_LEVEL", "1"))
+
+# JPEG quality when SOM_OUTPUT_FORMAT is "jpeg"
+SOM_JPEG_QUALITY = int(os.getenv("COMMUTER_SOM_JPEG_QUALITY", "80"))
+
+# (x, y, w, h, label) in image coordinates
+Box = Tuple[float, float, float, float, str]
+
+_font: Optional[ImageFont.ImageFont] = None
+_sprites: Dict[str, Image.Image] = {}
+
+
+def _get_font():
+    global _font
+    if _font is None:
+        try:
+            _font = ImageFont.load_default()
+        except Exception:
+            _font = None
+    return _font
+
+
+def label_sprite(label: str) -> Image.Image:
+    """Green ID tag for `label`, rendered once and reused across frames."""
+    sprite = _sprites.get(label)
+    if sprite is None:
+        font = _get_font()
+        text_width = ImageDraw.Draw(Image.new("RGB", (1, 1))).textlength(label, font=font)
+        sprite = Image.new("RGB", (max(LABEL_MIN_WIDTH, int(text_width) + 4), LABEL_HEIGHT), BOX_COLOR)
+        ImageDraw.Draw(sprite).text((2, 1), label, fill=LABEL_TEXT_COLOR, font=font)
+        _sprites[label] = sprite
+    return sprite
+
+
+def render_overlay(image: Image.Image, boxes: List[Box]) -> Image.Image:
+    """Draw SOM boxes and ID labels in place and return the image."""
+    draw = ImageDraw.Draw(image)
+    for x, y, w, h, label in boxes:
+        draw.rectangle([x, y, x + w, y + h], outline=BOX_COLOR, width=OUTLINE_WIDTH)
+        image.paste(label_sprite(label), (int(x), int(y)))
+    return image
+
+
+def encode_overlay(image: Image.Image) -> Tuple[str, str]:
+    """Encode a tagged frame for the dashboard. Returns (base64 data, mime type)."""
+    buffered = io.BytesIO()
+    if SOM_OUTPUT_FORMAT == "jpeg":
+        image.convert("RGB").save(buffered, format="JPEG", quality=SOM_JPEG_QUALITY)
+        mime = "image/jpeg"
+    else:
+        image.save(buffered, format="PNG", compress_level=SOM_PNG_COMPRESS_LEVEL)
+        mime = "image/png"
+    return base64.b64encode(buffered.getvalue()).decode("utf-8"), mime
@@ -0,0 +1,200 @@
+"""
+Incremental SOM Tracking
+A page-side MutationObserver keeps stable element IDs between captures and
+reports only added / changed / removed interactive elements back to Python.
+"""
+
+from typing import Dict
+
+# Page-side tracker, installed on first use in each document (a navigation starts a fresh one).
+# Runs inside the SOM tagging script; expects `dialog` (topmost modal or null) and defines `delta`.
+SOM_TRACKER_JS = """
+            const SELECTOR = 'button, a, input, select, textarea, [role="button"]';
+            let som = window.__som;
+            if (!som) {
+                som = window.__som = {
+                    ids: new WeakMap(), tracked: new Map(), last: new Map(), nextId: 1,
+                    pending: [document.documentElement], candidates: [], touched: [], reworded: [],
+                    dirty: true, full: true, fresh: true
+                };
+                // Scrolling and resizing move everything: the next capture re-reads every element
+                const markMoved = () => { som.dirty = true; som.full = true; };
+                som.observer = new MutationObserver((records) => {
+                    for (const record of records) {
+                        if (record.type === 'childList') {
+                            record.addedNodes.forEach((node) => { if (node.nodeType === 1) som.pending.push(node); });
+                            som.reworded.push(record.target);
+                        } else if (record.type === 'attributes') {
+                            // The node itself may have become interactive (e.g. gained role="button"),
+                            // and its whole subtree may have been shown, hidden or restyled
+                            som.candidates.push(record.target);
+                            som.touched.push(record.target);
+                        } else if (record.target.parentElement) {
+                            som.reworded.push(record.target.parentElement);
+                        }
+                    }
+                    som.dirty = true;
+                });
+                som.observer.observe(document.documentElement, {
+                    childList: true, subtree: true, characterData: true, attributes: true,
+                    attributeFilter: ['class', 'style', 'hidden', 'aria-hidden', 'aria-label', 'disabled', 'open', 'value', 'role']
+                });
+                window.addEventListener('scroll', markMoved, true);
+                window.addEventListener('resize', markMoved);
+            }
+
+            const delta = { reset: som.fresh, added: [], changed: [], removed: [] };
+            som.fresh = false;
+
+            if (som.dirty) {
+                som.dirty = false;
+                const full = som.full;
+                som.full = false;
+                const scroller = document.querySelector('[data-som-scroller]');
+                const view = scroller ? scroller.getBoundingClientRect() : null;
+
+                // 1. Discover candidates only inside subtrees added (or nodes changed) since the last capture
+                const track = (el) => {
+                    let id = som.ids.get(el);
+                    if (id === undefined) {
+                        id = som.nextId++;
+                        som.ids.set(el, id);
+                        // Stable handle so off-screen IDs can be scrolled into view before clicking
+                        el.setAttribute('data-som-id', String(id));
+                    }
+                    som.tracked.set(id, el);
+                };
+                // Accessible label for trace matching: aria-label, <label for> / wrapping label, placeholder, name
+                const labelOf = (el) => {
+                    const aria = el.getAttribute('aria-label');
+                    if (aria) return aria;
+                    if (el.labels && el.labels.length) return el.labels[0].innerText;
+                    return el.getAttribute('placeholder') || el.getAttribute('name') || el.innerText || '';
+                };
+                const pending = som.pending;
+                som.pending = [];
+                for (const root of pending) {
+                    if (!root.isConnected) continue;
+                    if (root.matches(SELECTOR)) track(root);
+                    root.querySelectorAll(SELECTOR).forEach(track);
+                }
+                const candidates = som.candidates;
+                som.candidates = [];
+                for (const el of candidates) {
+                    if (el.isConnected && el.matches(SELECTOR)) track(el);
+                }
+
+                // 2. Tracked elements that need a full re-read: those inside an added or re-attributed
+                //    subtree, and the element wrapping any changed text or children
+                const touched = new Set();
+                const touch = (el) => { const id = som.ids.get(el); if (id !== undefined) touched.add(id); };
+                const subtrees = som.touched.concat(pending);
+                const reworded = som.reworded;
+                som.touched = [];
+                som.reworded = [];
+                if (!full) {
+                    for (const node of subtrees.concat(reworded)) {
+                        if (!node.isConnected) continue;
+                        const owner = node.closest('[data-som-id]');
+                        if (owner) touch(owner);
+                    }
+                    for (const node of subtrees) {
+                        if (node.isConnected) node.querySelectorAll('[data-som-id]').forEach(touch);
+                    }
+                }
+
+                // 3. Diff against the last capture. Untouched elements only get a box read (a layout shift
+                //    elsewhere can move them); their text, label and visibility are reused.
+                const place = (item, rect) => {
+                    item.x = rect.x;
+                    item.y = rect.y;
+                    item.w = rect.width;
+                    item.h = rect.height;
+                    item.offscreen = rect.bottom < 0 || rect.top > window.innerHeight || rect.right < 0 || rect.left > window.innerWidth
+                        || (item.in_scroller && (rect.bottom < view.top || rect.top > view.bottom));
+                    return item;
+                };
+                const measure = (id, el, rect) => {
+                    if (rect.width <= 0 || rect.height <= 0 || window.getComputedStyle(el).visibility === 'hidden') return null;
+                    return place({
+                        id: id,
+                        tag: el.tagName,
+                        text: el.innerText ? el.innerText.substring(0, 20) : el.getAttribute('aria-label') || '',
+                        label: labelOf(el).trim().substring(0, 60),
+                        in_dialog: dialog ? dialog.contains(el) : false,
+                        in_scroller: scroller ? scroller.contains(el) : false
+                    }, rect);
+                };
+                const same = (a, b) => a.x === b.x && a.y === b.y && a.w === b.w && a.h === b.h && a.text === b.text
+                    && a.label === b.label && a.in_dialog === b.in_dialog && a.in_scroller === b.in_scroller && a.offscreen === b.offscreen;
+
+                for (const [id, el] of som.tracked) {
+                    const previous = som.last.get(id);
+                    let item = null;
+                    if (!el.isConnected || !el.matches(SELECTOR)) {
+                        som.tracked.delete(id);
+                    } else {
+                        const rect = el.getBoundingClientRect();
+                        if (full || previous === undefined || touched.has(id)) {
+                            item = measure(id, el, rect);
+                        } else if (rect.x === previous.x && rect.y === previous.y && rect.width === previous.w && rect.height === previous.h) {
+                            continue;
+                        } else {
+                            item = place(Object.assign({}, previous), rect);
+                        }
+                    }
+
+                    if (!item) {
+                        if (previous !== undefined) {
+                            delta.removed.push(id);
+                            som.last.delete(id);
+                        }
+                        continue;
+                    }
+                    if (previous === undefined) {
+                        delta.added.push(item);
+                    } else if (!same(previous, item)) {
+                        delta.changed.push(item);
+                    }
+                    som.last.set(id, item);
+                }
+            }
+"""
+
+
+def apply_som_delta(som_map: Dict[str, dict], delta: dict) -> dict:
+    """
+    Apply a page-side delta to the SOM map in place.
+    Entries keep their viewport box (left/top/w/h) plus the clickable center (x/y).
+
+    Returns:
+        dict with counts of added, changed and removed elements (and whether the map was reset)
+    """
+    if delta.get("reset"):
+        som_map.clear()
+
+    for element_id in delta.get("removed", []):
+        som_map.pop(str(element_id), None)
+
+    for el in delta.get("added", []) + delta.get("changed", []):
+        som_map[str(el["id"])] = {
+            "x": el["x"] + el["w"] / 2,
+            "y": el["y"] + el["h"] / 2,
+            "w": el["w"],
+            "h": el["h"],
+            "left": el["x"],
+            "top": el["y"],
+            "desc": el["text"],
+            "label": el.get("label", ""),
+            "tag": el["tag"],
+            "in_dialog": el.get("in_dialog", False),
+            "in_scroller": el.get("in_scroller", False),
+            "offscreen": el.get("offscreen", False),
+        }
+
+    return {
+        "reset": bool(delta.get("reset")),
+        "added": len(delta.get("added", [])),
+        "changed": len(delta.get("changed", [])),
+        "removed": len(delta.get("removed", [])),
+    }